@@ -0,0 +1,277 @@
+# -*- coding: UTF-8 -*-
+"""
+    benchmarks.display_benchmark
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure rendering performance of display without windows on screen.
+
+    Scene is rendered on `offscreen` platform, outputs are painted into images
+    exactly as output windows paint their surfaces.
+
+    Usage:
+        python benchmarks/display_benchmark.py --cases all --iterations 200 --json display.json
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# don't require display server
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from grail.qt import QtCore, QtGui
+from grail.plugins.display.scene import DisplayScene, DisplayWindow
+from grail.plugins.display.headless import HeadlessApplication
+
+CASES = ('text', 'outputs', 'size', 'layers', 'all')
+
+LYRICS = ["Amazing grace how sweet the sound\nThat saved a wretch like me\n"
+          "I once was lost but now am found\nWas blind but now I see",
+          "Twas grace that taught my heart to fear\nAnd grace my fears relieved\n"
+          "How precious did that grace appear\nThe hour I first believed",
+          "Through many dangers toils and snares\nI have already come\n"
+          "Tis grace hath brought me safe thus far\nAnd grace will lead me home"]
+
+
+class OutputHost:
+    """Stands for display plugin, output windows take scene from it"""
+
+    def __init__(self, scene):
+
+        self.scene = scene
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Returns dict of percentiles, mean and maximum of values in milliseconds"""
+
+    if not values:
+        return {}
+
+    values = sorted(values)
+    result = {'p%d' % point: values[min(len(values) - 1, int(len(values) * point / 100))] * 1000
+              for point in points}
+    result['mean'] = sum(values) / len(values) * 1000
+    result['max'] = values[-1] * 1000
+
+    return result
+
+
+def measure(fn, iterations):
+    """Call `fn(index)` given number of times
+
+    Returns:
+        list of durations in seconds
+    """
+
+    timings = []
+
+    for index in range(iterations):
+        started = time.perf_counter()
+        fn(index)
+        timings.append(time.perf_counter() - started)
+
+    return timings
+
+
+def create_scene(width, height):
+    """Returns scene with styled text, as used in shows"""
+
+    scene = DisplayScene()
+    scene.set_size(width, height)
+    scene.set_text_font(72, "Sans", "Bold")
+    scene.set_text_padding(40, 40, 40, 40)
+
+    return scene
+
+
+def keystone(width, height, amount):
+    """Returns transformation which moves top corners inside by `amount` of width"""
+
+    source = QtGui.QPolygonF([QtCore.QPointF(0, 0), QtCore.QPointF(width, 0),
+                              QtCore.QPointF(width, height), QtCore.QPointF(0, height)])
+    target = QtGui.QPolygonF([QtCore.QPointF(width * amount, 0), QtCore.QPointF(width * (1 - amount), 0),
+                              QtCore.QPointF(width, height), QtCore.QPointF(0, height)])
+
+    transform = QtGui.QTransform()
+    QtGui.QTransform.quadToQuad(source, target, transform)
+
+    return transform
+
+
+def text_case(width, height, iterations):
+    """Text swaps per second without shadow, with blurred shadow and repaint of unchanged text"""
+
+    result = {}
+
+    for variant, shadow in (('plain', (0, 0, 0, '#000000')), ('shadow', (4, 4, 12, '#000000'))):
+        scene = create_scene(width, height)
+        scene.set_text_shadow(*shadow)
+
+        def swap(index):
+            scene.set_text(LYRICS[index % len(LYRICS)])
+            scene.compositor.render()
+
+        timings = measure(swap, iterations)
+        result[variant] = {'swaps_per_second': len(timings) / sum(timings),
+                           'swap_time': percentiles(timings)}
+
+    # text is already laid out, frame costs only blit of cached image
+    timings = measure(lambda index: scene.compositor.render(), iterations)
+    result['unchanged'] = {'frames_per_second': len(timings) / sum(timings),
+                           'frame_time': percentiles(timings)}
+
+    return result
+
+
+def outputs_case(width, height, iterations, counts):
+    """Frames per second with number of outputs, every output has keystone transformation"""
+
+    result = {}
+
+    for count in counts:
+        scene = create_scene(width, height)
+        host = OutputHost(scene)
+        outputs = []
+        images = []
+
+        for index in range(count):
+            output = DisplayWindow(host)
+            output.setGeometry(0, 0, width, height)
+            output.setTransform(keystone(width, height, 0.05 * (index + 1)))
+
+            outputs.append(output)
+            images.append(QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied))
+
+        def frame(index):
+            scene.set_text(LYRICS[index % len(LYRICS)])
+            scene.compositor.render()
+
+            for output, image in zip(outputs, images):
+                painter = QtGui.QPainter()
+                painter.begin(image)
+                output.paint(painter, image.rect())
+                painter.end()
+
+        timings = measure(frame, iterations)
+        result[str(count)] = {'frames_per_second': len(timings) / sum(timings),
+                              'frame_time': percentiles(timings)}
+
+        for output in outputs:
+            output.close()
+
+    return result
+
+
+def size_case(width, height, iterations):
+    """Cost of changing composition size, test card texture is generated again"""
+
+    scene = create_scene(width, height)
+    sizes = ((width, height), (width // 2, height // 2))
+
+    timings = measure(lambda index: scene.set_size(*sizes[index % 2]), iterations)
+
+    return {'calls_per_second': len(timings) / sum(timings),
+            'call_time': percentiles(timings)}
+
+
+def layers_case(width, height, iterations, counts, video):
+    """Cost of creating media layers and rendering frames with them"""
+
+    result = {}
+
+    for count in counts:
+        scene = create_scene(width, height)
+        scene.set_max_layers(max(1, count))
+        scene.set_text(LYRICS[0])
+
+        started = time.perf_counter()
+
+        for layer in range(1, count + 1):
+            scene.clip_size(layer, width // 2, height // 2)
+            scene.clip_position(layer, layer * 10, layer * 10)
+            scene.clip_playback_source(layer, video)
+
+        setup = time.perf_counter() - started
+
+        # text is laid out on first frame
+        scene.compositor.render()
+
+        def frame(index):
+            scene.clip_opacity(1, 0.5 + (index % 2) / 2)
+            scene.compositor.render()
+
+        timings = measure(frame, iterations)
+        result[str(count)] = {'setup_time': setup * 1000,
+                              'frames_per_second': len(timings) / sum(timings),
+                              'frame_time': percentiles(timings)}
+
+    return result
+
+
+def main():
+    """Run benchmark from command line"""
+
+    parser = argparse.ArgumentParser(description="Grail display rendering benchmark")
+    parser.add_argument('--cases', default='all', help="comma separated list of cases: %s" % ', '.join(CASES))
+    parser.add_argument('--iterations', type=int, default=100, help="iterations of every measurement")
+    parser.add_argument('--size', default='1920x1080', help="size of composition, WIDTHxHEIGHT")
+    parser.add_argument('--outputs', default='1,2,4', help="numbers of outputs to measure")
+    parser.add_argument('--layers', default='0,2,8', help="numbers of media layers to measure")
+    parser.add_argument('--video', default=os.devnull, help="video file played by media layers")
+    parser.add_argument('--json', default='', help="write results to file")
+    args = parser.parse_args()
+
+    cases = set(args.cases.split(','))
+
+    if 'all' in cases:
+        cases = set(CASES)
+
+    if not cases.issubset(CASES):
+        parser.error("unknown case %s" % ', '.join(cases.difference(CASES)))
+
+    try:
+        width, height = (int(value) for value in args.size.lower().split('x'))
+    except ValueError:
+        parser.error("size should be given as WIDTHxHEIGHT")
+
+    app = HeadlessApplication(sys.argv[:1])
+    iterations = max(1, args.iterations)
+
+    result = {'environment': {'python': platform.python_version(),
+                              'qt': QtCore.QT_VERSION_STR,
+                              'platform': app.platformName(),
+                              'size': [width, height],
+                              'iterations': iterations}}
+
+    if 'text' in cases:
+        result['text'] = text_case(width, height, iterations)
+
+    if 'outputs' in cases:
+        counts = [int(count) for count in args.outputs.split(',')]
+        result['outputs'] = outputs_case(width, height, iterations, counts)
+
+    if 'size' in cases:
+        result['size'] = size_case(width, height, iterations)
+
+    if 'layers' in cases:
+        counts = [int(count) for count in args.layers.split(',')]
+        result['layers'] = layers_case(width, height, iterations, counts, args.video)
+
+    report = json.dumps(result, indent=4)
+
+    print(report)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            file.write(report)
+
+
+if __name__ == '__main__':
+    main()
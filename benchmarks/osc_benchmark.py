@@ -0,0 +1,289 @@
+# -*- coding: UTF-8 -*-
+"""
+    benchmarks.osc_benchmark
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Measure how many OSC messages Grail can absorb before display lags.
+
+    Load generator sends realistic mixes of messages over loopback UDP to OSCHost,
+    messages are delivered through application signals to DisplayScene.
+    Every message carries time of sending, so latency is measured from socket to scene setter.
+
+    Usage:
+        python benchmarks/osc_benchmark.py --mix all --rate 2000 --duration 5 --json report.json
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grailkit.osc import OSCMessage, OSCBundle
+
+from grail.qt import QtCore, QtWidgets
+from grail.core import OSCHost, Dispatcher
+from grail.plugins.display.scene import DisplayScene, DisplaySceneView
+
+MIXES = ('fader', 'text', 'bundle', 'legacy', 'all')
+
+HOST = '127.0.0.1'
+
+
+class BenchmarkApplication(QtWidgets.QApplication):
+    """Minimal application with signals and OSC host, as used by display"""
+
+    def __init__(self, port):
+        super(BenchmarkApplication, self).__init__(sys.argv[:1])
+
+        self.start = time.perf_counter()
+
+        self._signals = Dispatcher()
+        self._osc_host = OSCHost(self)
+        self._osc_host.input.add(HOST, port)
+
+    @property
+    def signals(self):
+        """Returns signals"""
+
+        return self._signals
+
+    @property
+    def osc(self):
+        """Returns OSC host"""
+
+        return self._osc_host
+
+    def clock(self):
+        """Returns seconds since start of benchmark, small enough to fit in float32"""
+
+        return time.perf_counter() - self.start
+
+
+class LoadGenerator(threading.Thread):
+    """Send mix of messages with given rate from separate thread"""
+
+    def __init__(self, app, port, mix, rate, duration):
+        super(LoadGenerator, self).__init__(daemon=True)
+
+        self.sent = 0
+
+        self._app = app
+        self._address = (HOST, port)
+        self._rate = rate
+        self._duration = duration
+        self._mixes = ('fader', 'text', 'bundle', 'legacy') if mix == 'all' else (mix,)
+
+    def run(self):
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        interval = 1 / self._rate
+        started = time.perf_counter()
+        index = 0
+
+        while time.perf_counter() - started < self._duration:
+            dgram = self.packet(self._mixes[index % len(self._mixes)], index)
+
+            try:
+                sock.sendto(dgram, self._address)
+                self.sent += 1
+            except OSError:
+                pass
+
+            index += 1
+
+            # keep rate without sleeping for less than scheduler can handle
+            delay = started + index * interval - time.perf_counter()
+
+            if delay > 0.001:
+                time.sleep(delay)
+
+        sock.close()
+
+    def packet(self, mix, index):
+        """Returns datagram of message from mix"""
+
+        now = self._app.clock()
+
+        if mix == 'fader':
+            return OSCMessage('/comp/opacity', [(index % 100) / 100, now]).build().dgram
+        elif mix == 'text':
+            return OSCMessage('/clip/text', ["%r" % now]).build().dgram
+        elif mix == 'legacy':
+            return OSCMessage('/grail/message', [bytes("%r" % now, 'utf-8')]).build().dgram
+
+        # bundle of layer changes and text, executed immediately
+        bundle = OSCBundle(messages=[OSCMessage('/clip/1/opacity', [0.5, now]),
+                                     OSCMessage('/clip/2/scale', [1.0, now]),
+                                     OSCMessage('/clip/text', ["%r" % now])])
+
+        return bundle.build().dgram
+
+
+class Recorder:
+    """Collect latency of delivery to scene and stalls of GUI thread"""
+
+    # interval of GUI thread probe, in milliseconds
+    PROBE_INTERVAL = 1
+
+    def __init__(self, app, scene):
+
+        self.latency = []
+        self.stalls = []
+        self.delivered = 0
+
+        self._app = app
+        self._scene = scene
+        self._last_tick = None
+
+        signals = app.signals
+        signals.connect('/comp/opacity', self._opacity)
+        signals.connect('/clip/1/opacity', self._clip_opacity)
+        signals.connect('/clip/2/scale', self._clip_scale)
+        signals.connect('/clip/text', self._text)
+
+        self._probe = QtCore.QTimer()
+        self._probe.setTimerType(QtCore.Qt.PreciseTimer)
+        self._probe.timeout.connect(self._tick)
+
+    def start(self):
+        """Start probing GUI thread"""
+
+        self._last_tick = time.perf_counter()
+        self._probe.start(self.PROBE_INTERVAL)
+
+    def stop(self):
+        """Stop probing"""
+
+        self._probe.stop()
+
+    def _tick(self):
+
+        now = time.perf_counter()
+        self.stalls.append(max(0, now - self._last_tick - self.PROBE_INTERVAL / 1000))
+        self._last_tick = now
+
+    def _record(self, sent):
+
+        self.delivered += 1
+        self.latency.append(self._app.clock() - sent)
+
+    def _opacity(self, value, sent):
+
+        self._scene.set_opacity(value)
+        self._record(sent)
+
+    def _clip_opacity(self, value, sent):
+
+        self._scene.clip_opacity(1, value)
+        self._record(sent)
+
+    def _clip_scale(self, value, sent):
+
+        self._scene.clip_scale(2, value)
+        self._record(sent)
+
+    def _text(self, text):
+
+        self._scene.set_text(text)
+
+        try:
+            self._record(float(text))
+        except ValueError:
+            pass
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Returns dict of percentiles and maximum of values in milliseconds"""
+
+    if not values:
+        return {}
+
+    values = sorted(values)
+    result = {'p%d' % point: values[min(len(values) - 1, int(len(values) * point / 100))] * 1000
+              for point in points}
+    result['max'] = values[-1] * 1000
+
+    return result
+
+
+def run(mix, rate, duration, port):
+    """Run one benchmark
+
+    Returns:
+        dict with results
+    """
+
+    app = BenchmarkApplication(port)
+
+    scene = DisplayScene()
+    scene.set_size(1920, 1080)
+
+    view = DisplaySceneView()
+    view.setScene(scene)
+    view.resize(480, 270)
+    view.show()
+
+    recorder = Recorder(app, scene)
+    generator = LoadGenerator(app, port, mix, rate, duration)
+
+    # let listener open socket
+    QtCore.QTimer.singleShot(100, generator.start)
+    QtCore.QTimer.singleShot(100, recorder.start)
+    QtCore.QTimer.singleShot(int(duration * 1000) + 600, app.quit)
+
+    app.exec_()
+
+    recorder.stop()
+    statistics = app.osc.input.statistics
+    app.osc.close()
+
+    return {'mix': mix,
+            'rate': rate,
+            'duration': duration,
+            'sent': generator.sent,
+            'received': statistics['received'],
+            'coalesced': statistics['coalesced'],
+            'dropped': statistics['dropped'],
+            'delivered': recorder.delivered,
+            'throughput': statistics['received'] / duration,
+            'latency': percentiles(recorder.latency),
+            'stall': percentiles(recorder.stalls)}
+
+
+def main():
+    """Run benchmark from command line"""
+
+    parser = argparse.ArgumentParser(description="Grail OSC ingest benchmark")
+    parser.add_argument('--mix', choices=MIXES, default='all', help="mix of messages to send")
+    parser.add_argument('--rate', type=float, default=1000, help="messages per second")
+    parser.add_argument('--duration', type=float, default=5, help="duration of benchmark in seconds")
+    parser.add_argument('--port', type=int, default=9500, help="UDP port of OSC input")
+    parser.add_argument('--json', default='', help="write results to file")
+    parser.add_argument('--max-latency', type=float, default=0, help="fail if p99 latency exceeds, ms")
+    parser.add_argument('--max-stall', type=float, default=0, help="fail if p99 GUI stall exceeds, ms")
+    args = parser.parse_args()
+
+    result = run(args.mix, args.rate, args.duration, args.port)
+    report = json.dumps(result, indent=4)
+
+    print(report)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            file.write(report)
+
+    failed = (args.max_latency and result['latency'].get('p99', 0) > args.max_latency) or \
+             (args.max_stall and result['stall'].get('p99', 0) > args.max_stall)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
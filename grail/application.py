@@ -17,14 +17,14 @@ import tempfile
 
 from grailkit.dna import SettingsFile, Project, Library, ProjectError, DNAError
 from grailkit.bible import BibleHost
-from grailkit.core import Signalable, Signal
+from grailkit.core import Signal
 
 import grail
 import grail.resources
 
 from grail.qt import *
 from grail.ui import MainWindow, WelcomeDialog
-from grail.core import OSCHost, Viewer, Configurator, Plugin
+from grail.core import OSCHost, Dispatcher, Viewer, Configurator, Plugin, CueEngine
 
 # load internal plugins and viewers
 from grail.plugins import *
@@ -92,7 +92,8 @@ class Grail(QtWidgets.QApplication):
         self._project = None
         self._library = None
         self._bible = None
-        self._signals = Signalable()
+        self._signals = Dispatcher()
+        self._cues = CueEngine(self)
         self._launched = False
 
         self.change_bible(self.settings.get('bible/default', ""))
@@ -157,6 +158,12 @@ class Grail(QtWidgets.QApplication):
 
         return self._midi_host
 
+    @property
+    def cues(self):
+        """Returns players of cuelists"""
+
+        return self._cues
+
     @property
     def console(self):
         """Returns console object"""
@@ -253,6 +260,7 @@ class Grail(QtWidgets.QApplication):
 
         self._project = project
         self._library = Library(grail.LIBRARY_PATH, create=True)
+        self._cues.clear()
 
         self.settings.set('project/last', path)
 
@@ -287,6 +295,9 @@ class Grail(QtWidgets.QApplication):
         for plug in Plugin.plugins() + Viewer.plugins() + Configurator.plugins():
             plug.unloaded()
 
+        self._cues.close()
+        self._osc_host.close()
+
         if self._library:
             self._library.close()
 
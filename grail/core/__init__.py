@@ -10,6 +10,10 @@
 import functools
 from .plugin import Plugin, Viewer, Configurator
 from .osc_host import OSCHost
+from .dispatch import Dispatcher, connect_slot, disconnect_slot
+from .cuelist import CuelistTree, CuelistOrder
+from .scheduler import CueScheduler
+from .cue_engine import CueEngine, CuelistPlayer
 
 
 def debug(func):
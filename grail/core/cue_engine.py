@@ -0,0 +1,332 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.core.cue_engine
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Play several cuelists at the same time.
+
+    Every cuelist has its own player with playhead and scheduled cues,
+    all players share one timing thread, OSC output and cache of encoded cues.
+    Player doesn't depend on cuelist view, so list keeps running
+    when view shows another cuelist or is closed.
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import weakref
+
+from grail.qt import QtCore, QtSignal
+
+from grailkit.dna import CueEntity
+from grailkit.osc import OSCMessage, OSCBundle
+
+from .cuelist import CuelistTree, CuelistOrder
+from .scheduler import CueScheduler
+
+__all__ = ['CueEngine', 'CuelistPlayer']
+
+
+class CueEngine(QtCore.QObject):
+    """Players of all cuelists of opened project"""
+
+    def __init__(self, app):
+        super(CueEngine, self).__init__()
+
+        self._app = app
+        self._project = None
+        self._players = {}
+        self._scheduler = CueScheduler(self)
+        # encoded OSC bundles of cues, by cue id
+        self._osc_cache = {}
+
+    @property
+    def app(self):
+        """Returns application"""
+
+        return self._app
+
+    @property
+    def scheduler(self):
+        """Returns scheduler shared by players"""
+
+        return self._scheduler
+
+    def player(self, cuelist_id):
+        """Returns player of cuelist, player is created on first request
+
+        Args:
+            cuelist_id (int): identifier of cuelist
+        """
+
+        if self._project is not self._app.project:
+            self.clear()
+
+        if cuelist_id not in self._players:
+            self._players[cuelist_id] = CuelistPlayer(self, cuelist_id)
+
+        return self._players[cuelist_id]
+
+    def players(self):
+        """Returns list of created players"""
+
+        return list(self._players.values())
+
+    def stop(self):
+        """Stop all cuelists"""
+
+        for player in self._players.values():
+            player.stop()
+
+    def clear(self):
+        """Stop and forget players, bind to opened project"""
+
+        self.stop()
+
+        self._players = {}
+        self._osc_cache = {}
+        self._project = self._app.project
+
+        # slots are named, unnamed ones are replaced by later connections
+        # and previous project is closed together with its signals
+        if self._project is not None:
+            self._project.entity_added.connect(self._entity_changed, name='cue_engine')
+            self._project.entity_changed.connect(self._entity_changed, name='cue_engine')
+            self._project.entity_removed.connect(self._entity_removed, name='cue_engine')
+            self._project.property_changed.connect(self._property_changed, name='cue_engine')
+
+    def close(self):
+        """Stop all cuelists and timing thread"""
+
+        self.stop()
+        self._scheduler.close()
+
+        self._players = {}
+        self._project = None
+
+    def _entity_changed(self, entity_id):
+
+        self._osc_cache.pop(entity_id, None)
+
+        players = [player for player in self._players.values() if player.loaded]
+        parent_id = None
+
+        # entity could be created or moved into cuelist,
+        # parent is read once and only if some of loaded cuelists doesn't know entity
+        if not all(player.contains(entity_id) for player in players):
+            entity = self._app.project.dna.entity(entity_id)
+            parent_id = entity.parent_id if entity else None
+
+        for player in players:
+            player.invalidate(entity_id, parent_id)
+
+    def _entity_removed(self, entity_id):
+
+        # removed entity is not known, only its parent
+        self._osc_cache.clear()
+
+        for player in self._players.values():
+            player.invalidate(entity_id)
+
+    def _property_changed(self, entity_id, key, value):
+
+        self._osc_cache.pop(entity_id, None)
+
+    def _osc_execute(self, cue):
+        """Send OSC bundle of cue
+
+        Send bundle with all valid OSC properties + entity info,
+        bundle is encoded once and reused until cue changes
+        """
+
+        dgram = self._osc_cache.get(cue.id)
+
+        if dgram is None:
+            dgram = self._osc_cache[cue.id] = self._osc_bundle(cue).build().dgram
+
+        self._app.osc.output.send_dgram(dgram)
+
+    def _osc_bundle(self, cue):
+        """Returns OSC bundle of cue"""
+
+        bundle = OSCBundle()
+        bundle.add(OSCMessage(address='/cue/id', args=[cue.id]))
+        bundle.add(OSCMessage(address='/cue/type', args=[cue.type]))
+        bundle.add(OSCMessage(address='/cue/parent', args=[cue.parent]))
+
+        name = OSCMessage(address='/cue/name')
+        # Blob value cannot be empty, so we replace it with one space
+        name.add(bytes(cue.name if len(cue.name) > 0 else " ", 'utf-8'))
+        bundle.add(name)
+
+        for key, value in cue.properties().items():
+            # check if property name is valid OSC address pattern
+            if not OSCMessage.is_valid_address(key):
+                continue
+
+            bundle.add(OSCMessage(address=key, args=[value]))
+
+        return bundle
+
+
+class CuelistPlayer(QtCore.QObject):
+    """Playhead and running cues of one cuelist
+
+    Next cue is taken from attached source, usually model of cuelist view
+    which already keeps order of playback. Without source order is loaded
+    from project and kept until cuelist changes.
+    """
+
+    # playhead moved to cue, by cue id
+    moved = QtSignal(int)
+
+    # cue executed
+    executed = QtSignal(object)
+
+    def __init__(self, engine, cuelist_id):
+        super(CuelistPlayer, self).__init__()
+
+        self.id = cuelist_id
+        self.playhead = None
+
+        self._engine = engine
+        self._source = None
+        self._tree = None
+        self._order = None
+
+    @property
+    def running(self):
+        """Returns True if cues of cuelist are waiting for execution"""
+
+        return self._engine.scheduler.pending(self) > 0
+
+    def attach(self, source):
+        """Take order of cues from source
+
+        Args:
+            source: object with `next_entity(entity_id)` method
+        """
+
+        self._source = weakref.ref(source)
+        self._tree = None
+        self._order = None
+
+    def detach(self, source):
+        """Stop using source, if it is attached"""
+
+        if self._source and self._source() is source:
+            self._source = None
+
+    @property
+    def loaded(self):
+        """Returns True if order of cues is loaded from project"""
+
+        return self._tree is not None
+
+    def contains(self, entity_id):
+        """Returns True if entity is cuelist or one of its cues in loaded order"""
+
+        return self._tree is not None and entity_id is not None and self._tree.contains(entity_id)
+
+    def invalidate(self, entity_id, parent_id=None):
+        """Forget loaded order if entity or its parent belongs to cuelist
+
+        Args:
+            entity_id (int): identifier of changed entity
+            parent_id (int): identifier of parent of entity, if it's known
+        """
+
+        if self.contains(entity_id) or self.contains(parent_id):
+            self._tree = None
+            self._order = None
+
+    def next_entity(self, entity_id):
+        """Returns cue played after given one or None"""
+
+        source = self._source() if self._source else None
+
+        if source:
+            return source.next_entity(entity_id)
+
+        if self._tree is None:
+            self._tree = CuelistTree(self._engine.app.project, self.id, keys=())
+            self._order = CuelistOrder(self._tree.walk())
+
+        return self._tree.entity(self._order.next(entity_id))
+
+    def go(self, cue, wait=0):
+        """Execute cue and cues which continue it
+
+        Cue which continues is scheduled when previous one is executed,
+        so changes of cuelist made meanwhile are respected. Deadlines are
+        computed from time of execution, delay of one cue doesn't shift following ones.
+
+        Args:
+            cue (CueEntity): cue of this cuelist
+            wait (float): seconds before execution
+        """
+
+        if not cue:
+            return False
+
+        scheduler = self._engine.scheduler
+
+        # cues still waiting for execution are replaced
+        scheduler.cancel_group(self)
+        deadline = scheduler.clock() + wait
+
+        self.playhead = cue.id
+
+        # pre wait
+        deadline += getattr(cue, 'pre_wait', 0)
+        scheduler.schedule(deadline, self._fire, cue, deadline, None, group=self, name="Cue %d" % cue.id)
+
+        return True
+
+    def stop(self):
+        """Cancel cues waiting for execution"""
+
+        self._engine.scheduler.cancel_group(self)
+
+    def _fire(self, cue, deadline, previous_id):
+        """Send cue when its time comes and schedule cue which continues it
+
+        Args:
+            cue (CueEntity): cue to execute
+            deadline (float): time of execution by clock of scheduler
+            previous_id (int): identifier of cue which is continued, None for first cue
+        """
+
+        # cue could be changed or removed while waiting, take one which follows now
+        if previous_id is not None:
+            cue = self.next_entity(previous_id)
+
+            if not cue:
+                return
+
+            if self.playhead != cue.id:
+                self.playhead = cue.id
+                self.moved.emit(cue.id)
+
+        # noinspection PyProtectedMember
+        self._engine._osc_execute(cue)
+        self._engine.app.signals.emit('!cue/execute', cue)
+        self.executed.emit(cue)
+
+        # nested cue, cue beside or beside of parent
+        if getattr(cue, 'follow', CueEntity.FOLLOW_OFF) != CueEntity.FOLLOW_CONTINUE:
+            return
+
+        next_cue = self.next_entity(cue.id)
+
+        if not next_cue:
+            return
+
+        # post wait and pre wait
+        deadline += cue.post_wait + getattr(next_cue, 'pre_wait', 0)
+
+        # cue which waits for execution
+        self.playhead = next_cue.id
+        self.moved.emit(next_cue.id)
+
+        self._engine.scheduler.schedule(deadline, self._fire, next_cue, deadline, cue.id,
+                                        group=self, name="Cue %d" % next_cue.id)
@@ -0,0 +1,256 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.core.cuelist
+    ~~~~~~~~~~~~~~~~~~
+
+    Load entity with all nested entities in one query.
+
+    Cuelist views need every cue and a few of their properties,
+    reading them entity by entity costs a query per cue and property.
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+from grailkit.db import DataBaseHost
+from grailkit.dna import DNA, DNAEntity
+
+__all__ = ['CuelistTree', 'CuelistOrder']
+
+# entity itself and all its descendants with properties of given keys,
+# UNION stops recursion if parents are looped
+_TREE_QUERY = """
+    WITH RECURSIVE tree(id) AS (
+        SELECT id FROM entities WHERE id = ?
+        UNION
+        SELECT entities.id FROM entities JOIN tree ON entities.parent = tree.id)
+    SELECT entities.id, entities.parent, entities.type, entities.name, entities.created,
+           entities.modified, entities.content, entities.search, entities.sort_order,
+           properties.key AS property_key, properties.value AS property_value,
+           properties.type AS property_type
+    FROM tree JOIN entities ON entities.id = tree.id
+    LEFT JOIN properties ON properties.entity = entities.id AND properties.key IN (%s)
+    ORDER BY entities.parent, entities.sort_order, entities.id"""
+
+
+class CuelistTree:
+    """Entity and all nested entities loaded at once, with index of parents"""
+
+    # properties shown by cuelist views
+    PROPERTIES = ('number', 'color', 'follow', 'expanded')
+
+    def __init__(self, project, entity_id, keys=PROPERTIES):
+        """Load entity and its descendants
+
+        Args:
+            project (DNA): project where entities are stored
+            entity_id (int): identifier of top entity, usually cuelist
+            keys (tuple): names of properties to load
+        """
+
+        self.id = entity_id
+
+        self._entities = {}
+        self._childs = {}
+        self._parents = {}
+        self._properties = {}
+
+        db = DataBaseHost.get(project.location)
+        rows = db.all(_TREE_QUERY % ', '.join('?' * len(keys)), (entity_id,) + tuple(keys))
+
+        for row in rows:
+            entity_id = row['id']
+
+            if entity_id not in self._entities:
+                factory = DNA.TYPES_FACTORIES.get(row['type'], DNAEntity)
+
+                self._entities[entity_id] = factory.from_sqlite(project, row)
+                self._properties[entity_id] = {}
+
+                # rows are sorted by parent and position
+                if entity_id != self.id:
+                    self._parents[entity_id] = row['parent']
+                    self._childs.setdefault(row['parent'], []).append(entity_id)
+
+            if row['property_key'] is not None:
+                # noinspection PyProtectedMember
+                self._properties[entity_id][row['property_key']] = \
+                    DNA._read_type(row['property_value'], row['property_type'])
+
+    def __len__(self):
+
+        return len(self._entities)
+
+    def entity(self, entity_id):
+        """Returns entity or None if it's not inside of tree"""
+
+        return self._entities.get(entity_id)
+
+    def childs(self, entity_id):
+        """Returns list of child entities in order"""
+
+        return [self._entities[child_id] for child_id in self._childs.get(entity_id, ())]
+
+    def get(self, entity_id, key, default=None):
+        """Returns value of loaded property"""
+
+        return self._properties.get(entity_id, {}).get(key, default)
+
+    def walk(self, entity_id=None):
+        """Returns identifiers of all entities nested in given one, in order of playback
+
+        Args:
+            entity_id (int): identifier of entity, top entity if not given
+        """
+
+        ids = []
+        stack = list(reversed(self._childs.get(self.id if entity_id is None else entity_id, ())))
+
+        while stack:
+            entity_id = stack.pop()
+
+            ids.append(entity_id)
+            stack.extend(reversed(self._childs.get(entity_id, ())))
+
+        return ids
+
+    def parent_id(self, entity_id):
+        """Returns identifier of parent or None for top entity"""
+
+        return self._parents.get(entity_id)
+
+    def contains(self, entity_id):
+        """Returns True if entity is top entity or nested in it, parents are followed in memory"""
+
+        while entity_id is not None:
+            if entity_id == self.id:
+                return True
+
+            entity_id = self._parents.get(entity_id)
+
+        return False
+
+
+class CuelistOrder:
+    """Cues of cuelist in order of playback, each cue is linked to next and previous one
+
+    Order is pre-order traversal of cuelist: cue, its nested cues, then cue beside.
+    It's built once and patched with runs of cues when cuelist structure changes,
+    so next cue is found without database access.
+    """
+
+    def __init__(self, ids=()):
+        """Create order
+
+        Args:
+            ids (iterable): identifiers of cues in order of playback
+        """
+
+        self._next = {}
+        self._prev = {}
+        self._first = None
+        self._last = None
+
+        self.link(list(ids))
+
+    def __len__(self):
+
+        return len(self._prev)
+
+    def __contains__(self, entity_id):
+
+        return entity_id in self._prev
+
+    def __iter__(self):
+
+        entity_id = self._first
+
+        while entity_id is not None:
+            yield entity_id
+
+            entity_id = self._next[entity_id]
+
+    def first(self):
+        """Returns identifier of first cue or None if order is empty"""
+
+        return self._first
+
+    def last(self):
+        """Returns identifier of last cue or None if order is empty"""
+
+        return self._last
+
+    def next(self, entity_id):
+        """Returns identifier of cue played after given one or None"""
+
+        return self._next.get(entity_id)
+
+    def prev(self, entity_id):
+        """Returns identifier of cue played before given one or None"""
+
+        return self._prev.get(entity_id)
+
+    def link(self, ids, after=None):
+        """Insert run of cues
+
+        Args:
+            ids (list): identifiers of cues in order of playback
+            after (int): identifier of cue after which run is inserted, None to insert at beginning
+        """
+
+        if not ids:
+            return
+
+        following = self._first if after is None else self._next[after]
+        previous = after
+
+        for entity_id in ids:
+            self._prev[entity_id] = previous
+
+            if previous is None:
+                self._first = entity_id
+            else:
+                self._next[previous] = entity_id
+
+            previous = entity_id
+
+        self._next[previous] = following
+
+        if following is None:
+            self._last = previous
+        else:
+            self._prev[following] = previous
+
+    def unlink(self, first, last):
+        """Remove run of cues
+
+        Args:
+            first (int): identifier of first cue of run
+            last (int): identifier of last cue of run
+        Returns:
+            list of removed identifiers
+        """
+
+        previous = self._prev[first]
+        following = self._next[last]
+        ids = []
+        entity_id = first
+
+        while entity_id is not None:
+            ids.append(entity_id)
+
+            del self._prev[entity_id]
+            entity_id = self._next.pop(entity_id) if entity_id != last else None
+
+        del self._next[last]
+
+        if previous is None:
+            self._first = following
+        else:
+            self._next[previous] = following
+
+        if following is None:
+            self._last = previous
+        else:
+            self._prev[following] = previous
+
+        return ids
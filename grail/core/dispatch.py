@@ -0,0 +1,263 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.core.dispatch
+    ~~~~~~~~~~~~~~~~~~~
+
+    Dispatch messages to connected callbacks by address or OSC address pattern
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import re
+import itertools
+
+from grailkit.core import Signal
+
+# characters which turn address into pattern
+_PATTERN_CHARS = frozenset('*?[]{}')
+
+# unique names of connected slots
+_SLOT_NAMES = itertools.count(1)
+
+
+def connect_slot(signal, fn):
+    """Connect callback to grailkit signal under unique name
+
+    Unnamed slots are keyed by number of slots, so once dead slot is flushed
+    next connection replaces one of living slots.
+
+    Args:
+        signal (Signal): grailkit signal
+        fn (callable): function to call
+    Returns:
+        name of slot
+    """
+
+    name = 'slot/%d' % next(_SLOT_NAMES)
+    signal.connect(fn, name=name)
+
+    return name
+
+
+def disconnect_slot(signal, fn):
+    """Disconnect callback from grailkit signal
+
+    `Signal.disconnect` doesn't match bound methods,
+    they are compared here by object and function.
+
+    Args:
+        signal (Signal): grailkit signal
+        fn (callable): function to disconnect
+    """
+
+    owner = getattr(fn, '__self__', None)
+    func = getattr(fn, '__func__', fn)
+
+    # noinspection PyProtectedMember
+    for name, (owner_ref, func_ref) in list(signal._fns.items()):
+        if owner_ref is None:
+            found = func_ref is fn
+        else:
+            found = owner_ref() is owner and func_ref() is func
+
+        if found:
+            # noinspection PyProtectedMember
+            del signal._fns[name]
+
+            break
+
+
+def is_pattern(address):
+    """Returns True if address contains OSC pattern characters"""
+
+    return not _PATTERN_CHARS.isdisjoint(address)
+
+
+def compile_pattern(pattern):
+    """Compile OSC 1.0 address pattern into regular expression
+
+    Args:
+        pattern (str): address pattern, for example `/clip/{1,2}/opacity`
+    Returns:
+        compiled regular expression which matches whole address
+    """
+
+    result = []
+    index = 0
+    length = len(pattern)
+
+    while index < length:
+        char = pattern[index]
+        index += 1
+
+        if char == '*':
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', index)
+
+            if end == -1:
+                result.append(re.escape(char))
+                continue
+
+            chars = pattern[index:end]
+            negate = chars.startswith('!')
+
+            if negate:
+                chars = chars[1:]
+
+            # keep `-` as range, escape everything else
+            chars = '-'.join(re.escape(part) for part in chars.split('-'))
+            result.append('[%s%s]' % ('^' if negate else '', chars))
+            index = end + 1
+        elif char == '{':
+            end = pattern.find('}', index)
+
+            if end == -1:
+                result.append(re.escape(char))
+                continue
+
+            result.append('(?:%s)' % '|'.join(re.escape(part) for part in pattern[index:end].split(',')))
+            index = end + 1
+        else:
+            result.append(re.escape(char))
+
+    return re.compile(''.join(result) + '$')
+
+
+class Dispatcher:
+    """Signal bus of application, compatible with `grailkit.core.Signalable`.
+
+    Callbacks are stored in a table keyed by address, so emitting a message
+    costs one dictionary lookup no matter how many callbacks are connected.
+    Messages with OSC address pattern (`/clip/*/opacity`, `/clip/{1,2}/scale`)
+    are delivered to every matching address, callbacks also may be connected
+    to a pattern. Resolved routes are cached until set of addresses changes.
+    """
+
+    # maximum number of cached routes
+    ROUTES_LIMIT = 4096
+
+    def __init__(self):
+
+        self._slots = {}
+        self._patterns = {}
+        self._routes = {}
+        self._bundle_slots = Signal()
+
+    def __bool__(self):
+
+        return True
+
+    def __len__(self):
+
+        return self.callbacks_length
+
+    @property
+    def callbacks_length(self):
+        """Returns number of registered callbacks"""
+
+        return sum(len(slot) for slot in self._slots.values()) + \
+            sum(len(slot) for _, slot in self._patterns.values()) + len(self._bundle_slots)
+
+    def connect(self, message, fn):
+        """Connect listener `fn` to slot `message`
+
+        Args:
+            message (str): slot address or address pattern
+            fn (callable): function to call
+        Raises:
+            ValueError if at least one of arguments is not supported
+        """
+
+        if not isinstance(message, str):
+            raise ValueError("Can't connect to slot '%s', given value is not of type string" % message)
+
+        if not callable(fn):
+            raise ValueError("Given function is not callable.")
+
+        if is_pattern(message):
+            if message not in self._patterns:
+                self._patterns[message] = (compile_pattern(message), Signal())
+                self._routes.clear()
+
+            connect_slot(self._patterns[message][1], fn)
+        else:
+            if message not in self._slots:
+                self._slots[message] = Signal()
+                self._routes.clear()
+
+            connect_slot(self._slots[message], fn)
+
+    def disconnect(self, message, fn):
+        """Disconnect listener from slot
+
+        Args:
+            message (str): slot address or address pattern
+            fn (callable): function to disconnect
+        """
+
+        if message in self._slots:
+            slot = self._slots[message]
+            disconnect_slot(slot, fn)
+
+            if len(slot) == 0:
+                del self._slots[message]
+                self._routes.clear()
+        elif message in self._patterns:
+            slot = self._patterns[message][1]
+            disconnect_slot(slot, fn)
+
+            if len(slot) == 0:
+                del self._patterns[message]
+                self._routes.clear()
+
+    def emit(self, message, *args):
+        """Trigger all listeners of message
+
+        Args:
+            message (str): address or address pattern
+            *args: list of arguments
+        """
+
+        route = self._routes.get(message)
+
+        if route is None:
+            route = self._route(message)
+
+        for slot in route:
+            slot.emit(*args)
+
+    def connect_bundle(self, fn):
+        """Connect a bundle listener"""
+
+        connect_slot(self._bundle_slots, fn)
+
+    def disconnect_bundle(self, fn):
+        """Remove bundle listener"""
+
+        disconnect_slot(self._bundle_slots, fn)
+
+    def emit_bundle(self, bundle):
+        """Emit bundle of messages"""
+
+        self._bundle_slots.emit(bundle)
+
+    def _route(self, message):
+        """Resolve and cache list of slots for message"""
+
+        if is_pattern(message):
+            regex = compile_pattern(message)
+            route = [slot for address, slot in self._slots.items() if regex.match(address)]
+        else:
+            route = [self._slots[message]] if message in self._slots else []
+            route.extend(slot for regex, slot in self._patterns.values() if regex.match(message))
+
+        if len(self._routes) >= self.ROUTES_LIMIT:
+            self._routes.clear()
+
+        route = tuple(route)
+        self._routes[message] = route
+
+        return route
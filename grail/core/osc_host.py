@@ -8,17 +8,35 @@
     :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
     :license: GNU, see LICENSE for more details.
 """
+import os
+import re
+import time
+import select
+import heapq
+import socket
 import logging
-import socketserver
+import itertools
+import threading
+import selectors
+import collections
 
 from grail.qt import QtCore, QtSignal
 
 from grailkit.osc import *
 
+from .osc_parser import parse, OSCBundleView
+
 
 class OSCHost:
     """Wrapper for OSC client and server"""
 
+    # OSC packets in UDP datagrams
+    UDP = 'udp'
+    # OSC 1.1 packets in SLIP framed TCP stream
+    TCP = 'tcp'
+
+    PROTOCOLS = (UDP, TCP)
+
     def __init__(self, application):
         """Take care of OSC in/out"""
 
@@ -38,15 +56,40 @@ class OSCHost:
 
         return self._client
 
+    def close(self):
+        """Close all connections"""
+
+        self._server.close()
+        self._client.close()
+
 
 class _OSCServer:
     """Handle incoming messages"""
 
+    # minimal interval between deliveries of messages to application, in seconds
+    FRAME_INTERVAL = 1 / 60
+
     def __init__(self, application):
 
         self._clients = []
-        self._ports = {}
         self._app = application
+        self._last_dispatch = 0
+
+        self._released = 0
+        self._release_late = 0
+        self._release_late_max = 0
+        self._release_late_total = 0
+
+        self._queue = _IngestQueue()
+
+        self._dispatch_timer = QtCore.QTimer()
+        self._dispatch_timer.setSingleShot(True)
+        self._dispatch_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._dispatch_timer.timeout.connect(self._dispatch)
+
+        self._listener = _ListenerThread(self._queue)
+        self._listener.pending.connect(self._pending, QtCore.Qt.QueuedConnection)
+        self._listener.due.connect(self._release, QtCore.Qt.QueuedConnection)
 
     @property
     def clients(self):
@@ -54,59 +97,73 @@ class _OSCServer:
 
         return self._clients
 
+    @property
+    def statistics(self):
+        """Returns dict with counters of received, coalesced, dropped, rejected, scheduled and late messages"""
+
+        statistics = self._queue.statistics()
+        statistics.update(self._listener.statistics())
+        statistics.update({'released': self._released,
+                           'release_late': self._release_late,
+                           'release_late_max': self._release_late_max,
+                           'release_late_mean': self._release_late_total / self._release_late
+                           if self._release_late else 0})
+
+        return statistics
+
     def clear(self):
         """Clear list of clients"""
 
         self._clients = []
-        self._ports = {}
+        self._listener.clear()
 
-    def add(self, address, port):
+    def add(self, address, port, protocol=OSCHost.UDP):
         """Add client to listen from
 
         Args:
-            address (str): ip address
+            address (str): ip address, '0.0.0.0' accepts messages from any host
             port (int): port
+            protocol (str): OSCHost.UDP or OSCHost.TCP
+        Raises:
+            ValueError if protocol is not supported
         """
-        self._clients.append((address, port))
 
-        if port not in self._ports:
-            # TODO: IP address ignored, do some work around to accept only from given IP
-            thread = _ListenerThread("0.0.0.0", port, self)
-            thread.received.connect(self.handle)
-            thread.start()
+        if protocol not in OSCHost.PROTOCOLS:
+            raise ValueError("Unsupported OSC protocol '%s'" % protocol)
+
+        self._clients.append((address, port, protocol))
+        self._listener.listen(port, protocol)
+        self._listener.set_sources(self._sources())
 
-            self._ports[port] = thread
+        if not self._listener.isRunning():
+            self._listener.start()
 
-    def remove(self, address, port):
+    def remove(self, address, port, protocol=OSCHost.UDP):
         """Remove client from list"""
 
-        port_used = 0
+        if (address, port, protocol) in self._clients:
+            self._clients.remove((address, port, protocol))
 
-        for client in self._clients:
-            if client[1] == port:
-                port_used += 1
+        # close port if nobody else uses it
+        if not any(client[1:] == (port, protocol) for client in self._clients):
+            self._listener.release(port, protocol)
 
-        for client in self._clients:
-            if client[0] == address and client[1] == port:
-                self._clients.remove(client)
+        self._listener.set_sources(self._sources())
 
-                if port_used == 1:
-                    self._ports[port].terminate()
-                    del self._ports[port]
+    def close(self):
+        """Stop listening on all ports"""
 
-                break
+        self._listener.stop()
 
     def handle(self, address, message, date):
         """Handle incoming osc messages"""
 
-        logging.info("OSC received from %s:%d by %s" % (address[0], address[1], self))
-
         signals = self._app.signals
 
         # forward messages to application
-        if isinstance(message, OSCBundle):
+        if isinstance(message, (OSCBundle, OSCBundleView)):
             for item in message:
-                signals.emit(item.address, *item.args)
+                self.handle(address, item, date)
         else:
             # pass single message signal
             signals.emit(message.address, *message.args)
@@ -115,53 +172,1154 @@ class _OSCServer:
             if message.address == "/grail/message":
                 signals.emit("/clip/text", str(message.args[0], "utf-8"))
 
+    def _pending(self):
+        """Listener queued new messages, deliver them not more often than once per frame"""
 
-class _OSCListener(OSCServer, socketserver.ThreadingMixIn):
-    """Listen for incoming OSC messages on certain port"""
+        if self._dispatch_timer.isActive():
+            return
 
-    def __init__(self, host, port, parent):
-        super(_OSCListener, self).__init__(host, port)
+        delay = self._last_dispatch + self.FRAME_INTERVAL - time.monotonic()
 
-        self._parent = parent
+        self._dispatch_timer.start(max(0, int(delay * 1000)))
 
-    def handle(self, address, message, date):
-        """Handle incoming message"""
+    def _dispatch(self):
+        """Deliver queued messages to application"""
+
+        self._last_dispatch = time.monotonic()
+
+        for address, message in self._queue.drain():
+            self.handle(address, message, 0)
+
+    def _release(self):
+        """Deliver bundles which time has come, every bundle at once and without waiting for frame"""
+
+        # messages which arrived before bundle was released keep their order
+        if len(self._queue):
+            self._dispatch()
+
+        for address, messages, deadline in self._listener.take_due():
+            late = time.monotonic() - deadline
+
+            self._released += 1
+
+            if late > _ListenerThread.LATE_TOLERANCE:
+                self._release_late += 1
+                self._release_late_total += late
+                self._release_late_max = max(self._release_late_max, late)
+
+            for message in messages:
+                self.handle(address, message, 0)
+
+    def _sources(self):
+        """Returns dict of allowed source addresses for every port and protocol, host names are not resolved"""
+
+        sources = {}
+
+        for address, port, protocol in self._clients:
+            sources.setdefault((port, protocol), set()).add(address)
+
+        return sources
+
+
+_ANY_ADDRESS = ('0.0.0.0', '', '*')
+
+_SLIP_END = b'\xc0'
+_SLIP_ESC = b'\xdb'
+_SLIP_ESC_END = b'\xdb\xdc'
+_SLIP_ESC_ESC = b'\xdb\xdd'
+
+
+def _slip_encode(data):
+    """Returns SLIP frame of packet, with END at both sides as OSC 1.1 recommends"""
+
+    return _SLIP_END + data.replace(_SLIP_ESC, _SLIP_ESC_ESC).replace(_SLIP_END, _SLIP_ESC_END) + _SLIP_END
+
+
+class _SlipDecoder:
+    """Split TCP stream into SLIP framed packets"""
+
+    # maximum size of frame, connection with bigger frames is considered broken
+    MAX_FRAME = 16 * 1024 * 1024
+
+    def __init__(self):
+
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received data
+
+        Returns:
+            list of complete packets
+        Raises:
+            OSCParseError if frame is too big
+        """
+
+        self._buffer += data
+        packets = []
+        end = self._buffer.rfind(_SLIP_END)
+
+        if end == -1:
+            if len(self._buffer) > self.MAX_FRAME:
+                raise OSCParseError("SLIP frame is too big")
+
+            return packets
 
-        self._parent.handle(address, message, date)
+        frames = bytes(self._buffer[:end]).split(_SLIP_END)
+        del self._buffer[:end + 1]
+
+        for frame in frames:
+            # empty frames appear between double END
+            if frame:
+                packets.append(frame.replace(_SLIP_ESC_END, _SLIP_END).replace(_SLIP_ESC_ESC, _SLIP_ESC))
+
+        return packets
+
+
+class _IngestQueue:
+    """Thread safe queue of incoming messages between listener and application.
+
+    Messages to continuous-value addresses (faders, positions) are coalesced,
+    only the latest value of every address waits for delivery and it keeps
+    place of the first one. All other messages are delivered strictly in order.
+    """
+
+    # addresses which values can be replaced by newer ones, `*` matches one part of address
+    CONTINUOUS = ('/comp/opacity',
+                  '/comp/volume',
+                  '/clip/*/opacity',
+                  '/clip/*/volume',
+                  '/clip/*/scale',
+                  '/clip/*/rotate',
+                  '/clip/*/pos',
+                  '/clip/*/size',
+                  '/clip/*/playback/position')
+
+    def __init__(self, capacity=4096):
+
+        self._capacity = capacity
+        self._lock = threading.Lock()
+        self._items = collections.deque()
+        self._latest = {}
+        self._continuous = re.compile('|'.join(
+            '(?:%s)' % re.escape(address).replace(r'\*', '[^/]+') for address in self.CONTINUOUS) + '$')
+
+        self._received = 0
+        self._coalesced = 0
+        self._dropped = 0
+
+    def __len__(self):
+
+        return len(self._items)
+
+    def is_continuous(self, address):
+        """Returns True if value of address may be coalesced"""
+
+        return bool(self._continuous.match(address))
+
+    def put(self, source, message):
+        """Add message to queue
+
+        Args:
+            source (tuple): host and port of sender
+            message (OSCMessageView): message
+        Returns:
+            True if queue was empty before this message
+        """
+
+        address = message.address
+        continuous = self.is_continuous(address)
+
+        with self._lock:
+            self._received += 1
+
+            if continuous and address in self._latest:
+                self._latest[address][1] = message
+                self._coalesced += 1
+
+                return False
+
+            if len(self._items) >= self._capacity:
+                self._dropped += 1
+
+                return False
+
+            item = [source, message]
+            self._items.append(item)
+
+            if continuous:
+                self._latest[address] = item
+
+            return len(self._items) == 1
+
+    def drain(self):
+        """Take all queued messages
+
+        Returns:
+            list of (source, message) pairs
+        """
+
+        with self._lock:
+            items = self._items
+            self._items = collections.deque()
+            self._latest = {}
+
+        return items
+
+    def statistics(self):
+        """Returns dict of counters"""
+
+        with self._lock:
+            return {'received': self._received,
+                    'coalesced': self._coalesced,
+                    'dropped': self._dropped,
+                    'pending': len(self._items)}
 
 
 class _ListenerThread(QtCore.QThread):
-    """Qt thread with OSCServer"""
+    """Listen for incoming OSC messages on any number of ports with a single thread.
+
+    Every port has its own non-blocking UDP or TCP socket and all of them,
+    including TCP connections, are served by one selector, so adding ports doesn't add threads.
+    Datagrams and connections from hosts which are not in list of sources are dropped before parsing.
+    Parsed messages are put to ingest queue and `pending` emitted when queue wakes up.
+
+    Host names of sources are resolved in background, literal name is used until lookup finishes.
+
+    Bundles with timetag are held in priority queue and released by the same thread
+    when their time comes. Released bundles don't go through ingest queue,
+    they are delivered as a whole when `due` is emitted, without coalescing and frame limit.
+    """
 
-    received = QtSignal(object, object, object)
+    pending = QtSignal()
 
-    def __init__(self, host, port, parent: object):
+    due = QtSignal()
+
+    # maximum size of UDP datagram
+    BUFFER_SIZE = 65535
+
+    # bundles scheduled further than this amount of seconds are executed immediately
+    SCHEDULE_LIMIT = 60
+
+    # bundles which arrived later than this amount of seconds are counted as late
+    LATE_TOLERANCE = 0.001
+
+    def __init__(self, queue: _IngestQueue):
         super(_ListenerThread, self).__init__()
 
-        self.listener = None
-        self.parent = parent
+        self.rejected = 0
+        self.scheduled = 0
+        self.cancelled = 0
+        self.late = 0
+        self.late_max = 0
+        self.late_total = 0
+
+        self._queue = queue
+        self._schedule = []
+        self._due = collections.deque()
+        self._sequence = itertools.count()
+        self._running = False
+        self._sockets = {}
+        self._connections = {}
+        self._sources = {}
+        # sources as given and ip addresses of host names, None while lookup is running
+        self._names = {}
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+        self._commands = collections.deque()
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+
+    def listen(self, port, protocol=OSCHost.UDP):
+        """Open port, socket will be created in listener thread"""
+
+        self._command(self._open, port, protocol)
+
+    def release(self, port, protocol=OSCHost.UDP):
+        """Close port"""
+
+        self._command(self._close, port, protocol)
+
+    def clear(self):
+        """Close all ports"""
+
+        self.set_sources({})
+        self._command(self._close_all)
+
+    def set_sources(self, sources):
+        """Set allowed source addresses, host names are resolved in background
+
+        Args:
+            sources (dict): port and protocol as key and set of ip addresses or host names as value
+        """
+
+        with self._hosts_lock:
+            self._names = sources
+            # replace reference at once, so listener always reads consistent state
+            self._sources = self._addresses(sources)
+
+            for address in set(itertools.chain.from_iterable(sources.values())):
+                if address in self._hosts or address in _ANY_ADDRESS:
+                    continue
+
+                try:
+                    socket.inet_aton(address)
+                except (OSError, UnicodeError):
+                    self._hosts[address] = None
+
+                    threading.Thread(target=self._look_up, args=(address,),
+                                     name="OSC lookup %s" % address, daemon=True).start()
+
+    def start(self, priority=QtCore.QThread.InheritPriority):
+        """Start listening"""
+
+        self._running = True
+
+        super(_ListenerThread, self).start(priority)
+
+    def stop(self):
+        """Stop listening and wait until thread finishes"""
+
+        self._running = False
+        self._wakeup()
+        self.wait(1000)
+
+    def run(self):
+        """Serve all sockets"""
+
+        while self._running:
+            timeout = None
+
+            if self._schedule:
+                timeout = max(0, self._schedule[0][0] - time.monotonic())
+
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wakeup_reader:
+                    self._process_commands()
+                elif isinstance(key.data, _SlipDecoder):
+                    self._receive(key.fileobj)
+                elif key.data[1] == OSCHost.TCP:
+                    self._accept(key.fileobj, key.data[0])
+                else:
+                    self._read(key.fileobj, key.data[0])
+
+            self._release()
+
+        self._close_all()
+        self._schedule = []
+
+    def statistics(self):
+        """Returns dict with counters of scheduled and late bundles"""
+
+        return {'rejected': self.rejected,
+                'scheduled': self.scheduled,
+                'cancelled': self.cancelled,
+                'late': self.late,
+                'late_max': self.late_max,
+                'late_mean': self.late_total / self.late if self.late else 0}
+
+    def take_due(self):
+        """Returns list of released bundles, as lists of messages, with their deadlines of monotonic clock"""
+
+        items = []
+
+        # listener only appends, so queue can't become empty between check and pop
+        while self._due:
+            items.append(self._due.popleft())
+
+        return items
+
+    def _read(self, sock, port):
+        """Read all pending datagrams from socket"""
+
+        while True:
+            try:
+                data, address = sock.recvfrom(self.BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as error:
+                logging.warning("OSC unable to read from port %d: %s" % (port, error))
+                return
+
+            # drop datagrams from unknown hosts before parsing them
+            if not self._allowed(address, port, OSCHost.UDP):
+                self.rejected += 1
+                continue
+
+            self._packet(address, data, (port, OSCHost.UDP))
+
+    def _accept(self, sock, port):
+        """Accept TCP connection"""
 
         try:
-            self.listener = _OSCListener(host, port, self)
+            connection, address = sock.accept()
         except OSError:
-            self.terminate()
+            return
 
-    def handle(self, address, message, date):
-        """Pass message to parent thread"""
+        if not self._allowed(address, port, OSCHost.TCP):
+            self.rejected += 1
+            connection.close()
 
-        self.received.emit(address, message, date)
+            return
 
-    def run(self):
-        """Run listener"""
+        connection.setblocking(False)
+
+        self._connections[connection] = (address, port)
+        self._selector.register(connection, selectors.EVENT_READ, _SlipDecoder())
+
+    def _receive(self, connection):
+        """Read packets from TCP connection"""
+
+        address, port = self._connections[connection]
+        decoder = self._selector.get_key(connection).data
+
+        try:
+            data = connection.recv(self.BUFFER_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+
+        try:
+            # empty data means that connection was closed by other side
+            packets = decoder.feed(data) if data else None
+        except OSCParseError as error:
+            logging.warning("OSC closing connection from %s: %s" % (address[0], error))
+            packets = None
+
+        if packets is None:
+            self._disconnect(connection)
+
+            return
+
+        for packet in packets:
+            self._packet(address, packet, (port, OSCHost.TCP))
+
+    def _disconnect(self, connection):
+        """Close TCP connection"""
 
-        if self.listener:
-            self.listener.serve_forever()
+        self._connections.pop(connection, None)
+        self._selector.unregister(connection)
+        connection.close()
+
+    def _addresses(self, sources):
+        """Returns sources with host names replaced by ip addresses which are already known"""
+
+        return {key: set(_ANY_ADDRESS[0] if address in _ANY_ADDRESS else self._hosts.get(address) or address
+                         for address in addresses)
+                for key, addresses in sources.items()}
+
+    def _look_up(self, address):
+        """Resolve host name of source, called from lookup thread"""
+
+        try:
+            host = socket.gethostbyname(address)
+        except (OSError, UnicodeError):
+            host = None
+
+        with self._hosts_lock:
+            if host:
+                self._hosts[address] = host
+            else:
+                # name is looked up again when sources are set next time
+                del self._hosts[address]
+
+            self._sources = self._addresses(self._names)
+
+    def _allowed(self, address, port, protocol):
+        """Returns True if messages from address are accepted on port of protocol"""
+
+        sources = self._sources.get((port, protocol), ())
+
+        return address[0] in sources or _ANY_ADDRESS[0] in sources
+
+    def _packet(self, address, data, key):
+        """Parse packet and put it to queue or schedule
+
+        Args:
+            address (tuple): host and port of sender
+            data (bytes): OSC packet
+            key (tuple): port and protocol where packet was received
+        """
+
+        if not data.startswith((b'/', b'#bundle')):
+            self.rejected += 1
+            return
+
+        try:
+            packet = parse(data)
+        except OSCParseError:
+            logging.warning("OSCParseError: Could not parse OSC packet")
+            self.rejected += 1
+            return
+
+        if isinstance(packet, OSCBundleView) and packet.time is not None:
+            self._schedule_bundle(address, packet, key)
+        else:
+            self._put(address, packet, key)
+
+    def _schedule_bundle(self, address, bundle, key):
+        """Hold bundle until its timetag, bundles which time has passed are queued in order with other messages"""
+
+        now = time.monotonic()
+        delay = bundle.time - time.time()
+
+        if delay > self.SCHEDULE_LIMIT:
+            logging.warning("OSC bundle from %s is scheduled %.1f seconds ahead, executing immediately" %
+                            (address[0], delay))
+        elif delay > 0:
+            heapq.heappush(self._schedule, (now + delay, next(self._sequence), address, bundle, key))
+            self.scheduled += 1
+
+            return
+        elif -delay > self.LATE_TOLERANCE:
+            self.late += 1
+            self.late_total += -delay
+            self.late_max = max(self.late_max, -delay)
+
+        self._put(address, bundle, key)
+
+    def _release(self):
+        """Release bundles which time has come"""
+
+        now = time.monotonic()
+        released = False
+
+        while self._schedule and self._schedule[0][0] <= now:
+            deadline, _, address, bundle, key = heapq.heappop(self._schedule)
+
+            # port was closed and not opened again
+            if key not in self._sockets:
+                self.cancelled += 1
+                continue
+
+            self._due.append((address, self._unpack(address, bundle, key, []), deadline))
+            released = True
+
+        if released:
+            self.due.emit()
+
+    def _unpack(self, address, bundle, key, messages):
+        """Returns messages of released bundle, nested bundles with later timetag are scheduled"""
+
+        for item in bundle:
+            if not isinstance(item, OSCBundleView):
+                messages.append(item)
+            elif item.time is not None and item.time > time.time():
+                self._schedule_bundle(address, item, key)
+            else:
+                self._unpack(address, item, key, messages)
+
+        return messages
+
+    def _put(self, address, message, key):
+        """Put message or messages of bundle to ingest queue, nested bundles with later timetag are scheduled"""
+
+        if isinstance(message, OSCBundleView):
+            for item in message:
+                if isinstance(item, OSCBundleView) and item.time is not None and item.time > time.time():
+                    self._schedule_bundle(address, item, key)
+                else:
+                    self._put(address, item, key)
+        elif self._queue.put(address, message):
+            self.pending.emit()
+
+    def _command(self, fn, *args):
+        """Run `fn` inside of listener thread"""
+
+        self._commands.append((fn, args))
+
+        if self.isRunning():
+            self._wakeup()
+        else:
+            self._process_commands()
+
+    def _wakeup(self):
+        """Interrupt selector"""
+
+        try:
+            self._wakeup_writer.send(b'\x00')
+        except BlockingIOError:
+            pass
+
+    def _process_commands(self):
+        """Execute queued commands"""
+
+        try:
+            while self._wakeup_reader.recv(1024):
+                pass
+        except BlockingIOError:
+            pass
+
+        while self._commands:
+            fn, args = self._commands.popleft()
+            fn(*args)
+
+    def _open(self, port, protocol):
+        """Create socket for port"""
+
+        if (port, protocol) in self._sockets:
+            return
+
+        tcp = protocol == OSCHost.TCP
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM if tcp else socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            sock.bind(("0.0.0.0", port))
+
+            if tcp:
+                sock.listen()
+        except OSError as error:
+            logging.warning("OSC unable to listen on %s port %d: %s" % (protocol, port, error))
+            sock.close()
+
+            return
+
+        sock.setblocking(False)
+
+        self._sockets[(port, protocol)] = sock
+        self._selector.register(sock, selectors.EVENT_READ, (port, protocol))
+
+    def _close(self, port, protocol):
+        """Close socket of port and its connections"""
+
+        sock = self._sockets.pop((port, protocol), None)
+
+        if sock:
+            self._selector.unregister(sock)
+            sock.close()
+
+        if protocol == OSCHost.TCP:
+            for connection, (_, connection_port) in list(self._connections.items()):
+                if connection_port == port:
+                    self._disconnect(connection)
+
+    def _close_all(self):
+        """Close all sockets, scheduled bundles wait in case ports are opened again"""
+
+        for port, protocol in list(self._sockets.keys()):
+            self._close(port, protocol)
 
 
 class _OSCClient(OSCClient):
-    """Send OSC messages to multiple hosts"""
+    """Send OSC messages to multiple hosts.
+
+    Messages are encoded once and put to a bounded queue of every destination,
+    a background thread sends them, so slow or unreachable hosts never block the caller.
+    """
+
+    # drop oldest message when queue of destination is full
+    POLICY_DROP = 'drop'
+    # wait for free space in queue of destination, but not longer than `BLOCK_TIMEOUT`
+    POLICY_BLOCK = 'block'
+
+    # maximum number of messages waiting for every destination
+    QUEUE_SIZE = 256
+
+    # maximum time in seconds to wait for a queue with `POLICY_BLOCK`
+    BLOCK_TIMEOUT = 0.05
 
     def __init__(self, application):
         super(_OSCClient, self).__init__()
 
         self._app = application
+        self._policy = self.POLICY_DROP
+        self._destinations = {}
+        self._condition = threading.Condition()
+        self._sender = _SenderThread(self)
+
+    @property
+    def policy(self):
+        """Returns policy applied when queue of destination is full"""
+
+        return self._policy
+
+    @policy.setter
+    def policy(self, policy):
+        """Set policy applied when queue of destination is full"""
+
+        if policy not in (self.POLICY_DROP, self.POLICY_BLOCK):
+            raise ValueError("Unknown queue policy '%s'" % policy)
+
+        self._policy = policy
+
+    @property
+    def statistics(self):
+        """Returns dict of counters and send latency for every destination"""
+
+        with self._condition:
+            return {key: destination.statistics() for key, destination in self._destinations.items()}
+
+    def add(self, address, port, protocol=OSCHost.UDP):
+        """Add a recipient
+
+        Args:
+            address (str): ip address or host name of server
+            port (int): port of server
+            protocol (str): OSCHost.UDP or OSCHost.TCP
+        Raises:
+            ValueError if one of arguments is invalid
+        """
+
+        if not isinstance(address, str):
+            raise ValueError("Given address is not a string")
+
+        if not isinstance(port, int) or port <= 0:
+            raise ValueError("Given port number is not int or invalid")
+
+        if protocol not in OSCHost.PROTOCOLS:
+            raise ValueError("Unsupported OSC protocol '%s'" % protocol)
+
+        self._clients.append((address, port, protocol))
+
+        with self._condition:
+            if (address, port, protocol) not in self._destinations:
+                self._destinations[(address, port, protocol)] = _Destination(address, port, protocol,
+                                                                             self.QUEUE_SIZE, self._wakeup)
+
+    def remove(self, address, port, protocol=OSCHost.UDP):
+        """Remove a recipient"""
+
+        if (address, port, protocol) in self._clients:
+            self._clients.remove((address, port, protocol))
+
+        with self._condition:
+            if (address, port, protocol) not in self._clients:
+                destination = self._destinations.pop((address, port, protocol), None)
+
+                if destination:
+                    destination.closed = True
+                    destination.disconnect()
+
+    def clear(self):
+        """Clear list of recipients"""
+
+        super(_OSCClient, self).clear()
+
+        with self._condition:
+            for destination in self._destinations.values():
+                destination.closed = True
+                destination.disconnect()
+
+            self._destinations = {}
+
+    def send(self, message):
+        """Send an OSCBundle or OSCMessage to all recipients
+
+        Args:
+            message (OSCMessage, OSCBundle): a OSCMessage or OSCBundle to send
+        """
+
+        if not isinstance(message, (OSCMessage, OSCBundle)):
+            raise ValueError("Given message is not a OSCMessage or OSCBundle")
+
+        self.send_dgram(message.build().dgram)
+
+    def send_dgram(self, dgram):
+        """Send already encoded message or bundle to all recipients
+
+        Args:
+            dgram (bytes): datagram of OSC packet
+        """
+
+        if not self._destinations:
+            return
+
+        if not self._sender.isRunning():
+            self._sender.start()
+
+        now = time.monotonic()
+        frame = None
+
+        with self._condition:
+            if self._policy == self.POLICY_BLOCK:
+                self._condition.wait_for(lambda: not any(destination.full for destination in
+                                                         self._destinations.values()), self.BLOCK_TIMEOUT)
+
+            for destination in self._destinations.values():
+                if destination.protocol == OSCHost.TCP:
+                    # encode stream frame once for all TCP destinations
+                    if frame is None:
+                        frame = _slip_encode(dgram)
+
+                    destination.put(now, frame)
+                else:
+                    destination.put(now, dgram)
+
+            self._condition.notify_all()
+
+    def close(self):
+        """Send remaining messages and close sockets"""
+
+        self._sender.stop()
+
+        with self._condition:
+            for destination in self._destinations.values():
+                destination.disconnect()
+
+        super(_OSCClient, self).close()
+
+    def _take(self):
+        """Wait for queued messages, called from sender thread
+
+        Returns:
+            list of (destination, time, packet) or None if sender should stop
+        """
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                destinations = [destination for destination in self._destinations.values() if destination.pending]
+                ready = [destination for destination in destinations if destination.ready(now)]
+
+                if ready or not self._sender.running:
+                    break
+
+                # sleep until next destination can retry
+                retry = min((destination.retry for destination in destinations), default=now)
+                self._condition.wait(retry - now if destinations else None)
+
+            # one message of every destination per round, so busy hosts don't hold others,
+            # destination without messages only writes rest of previous TCP frame
+            items = [(destination,) + (destination.queue.popleft() if destination.queue else (now, None))
+                     for destination in ready]
+
+            if items:
+                self._condition.notify_all()
+
+            return items if items or self._sender.running else None
+
+    def _requeue(self, destination, date, packet):
+        """Return packet which wasn't delivered to front of queue"""
+
+        with self._condition:
+            if destination.closed or destination.full:
+                destination.dropped += 1
+            else:
+                destination.queue.appendleft((date, packet))
+
+    def _wakeup(self):
+        """Wake up sender thread"""
+
+        with self._condition:
+            self._condition.notify_all()
+
+
+class _Destination:
+    """Queue, connection and counters of OSC output destination
+
+    Nothing here blocks sender thread: host name is looked up in background,
+    TCP socket is non-blocking and frame which doesn't fit into socket buffer
+    is written in following rounds of sender.
+    """
+
+    # seconds to wait before next attempt to reach destination after failure
+    RETRY_INTERVAL = 1
+
+    # seconds between checks of pending TCP connection or stalled TCP write
+    POLL_INTERVAL = 0.01
+
+    # seconds to wait for TCP connection and for stalled TCP write
+    TCP_TIMEOUT = 2
+
+    def __init__(self, address, port, protocol, size, wakeup):
+
+        self.address = address
+        self.port = port
+        self.protocol = protocol
+        self.queue = collections.deque()
+        self.retry = 0
+        self.closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self.latency = 0
+        self.latency_max = 0
+        self.latency_total = 0
+
+        self._size = size
+        self._wakeup = wakeup
+        self._resolved = None
+        self._lookup = None
+        self._lookup_error = None
+        self._socket = None
+        self._connected = False
+        self._connect_deadline = 0
+        self._buffer = b''
+        self._write_deadline = 0
+
+    @property
+    def full(self):
+        """Returns True if queue has no space"""
+
+        return len(self.queue) >= self._size
+
+    @property
+    def pending(self):
+        """Returns True if there are messages to send or rest of TCP frame to write"""
+
+        return bool(self.queue or self._buffer)
+
+    def ready(self, now):
+        """Returns True if destination may be tried now"""
+
+        # messages wait until host name is looked up
+        if self._lookup:
+            return False
+
+        # messages of UDP destination are discarded while it's failing
+        return self.retry <= now or self.protocol == OSCHost.UDP
+
+    def put(self, date, packet):
+        """Add packet to queue, oldest one is dropped if queue is full"""
+
+        if self.full:
+            self.queue.popleft()
+            self.dropped += 1
+
+        self.queue.append((date, packet))
+
+    def send(self, sock, date, packet):
+        """Send packet and update counters
+
+        Args:
+            sock: UDP socket shared by destinations
+            date (float): monotonic time when packet was queued
+            packet (bytes): datagram or SLIP frame, None to write rest of previous TCP frame
+        Returns:
+            False if packet should be sent again later
+        """
+
+        if self.retry > time.monotonic() and self.protocol == OSCHost.UDP:
+            self.errors += 1
+
+            return True
+
+        try:
+            if not self._resolve():
+                return False
+
+            if self.protocol == OSCHost.TCP:
+                # frames can't be interleaved, previous one is written first
+                if not self._connect() or not self._write():
+                    return False
+
+                if packet is None:
+                    return True
+
+                self._buffer = packet
+                self._write()
+            else:
+                sock.sendto(packet, self._resolved)
+        except (OSError, UnicodeError) as error:
+            self.errors += 1
+            self.retry = time.monotonic() + self.RETRY_INTERVAL
+            self._resolved = None
+            self.disconnect()
+
+            logging.warning("OSC unable to send to %s:%d: %s" % (self.address, self.port, error))
+
+            # TCP messages wait for reconnection
+            return self.protocol == OSCHost.UDP
+
+        latency = time.monotonic() - date
+
+        self.sent += 1
+        self.latency = latency
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+        return True
+
+    def disconnect(self):
+        """Close TCP connection"""
+
+        if self._socket:
+            self._socket.close()
+
+        self._socket = None
+        self._connected = False
+        self._buffer = b''
+        self._write_deadline = 0
+
+    def statistics(self):
+        """Returns dict of counters"""
+
+        return {'sent': self.sent,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'pending': len(self.queue),
+                'connected': self._connected if self.protocol == OSCHost.TCP else True,
+                'latency': self.latency,
+                'latency_max': self.latency_max,
+                'latency_mean': self.latency_total / self.sent if self.sent else 0}
+
+    def _connect(self):
+        """Connect without blocking sender thread
+
+        Returns:
+            True if connection is established
+        Raises:
+            OSError if connection failed
+        """
+
+        if self._connected:
+            readable, _, _ = select.select([self._socket], [], [], 0)
+
+            # server never sends anything, so readable socket was closed by other side
+            if readable and not self._socket.recv(1, socket.MSG_PEEK):
+                raise OSError("connection closed by server")
+
+            return True
+
+        now = time.monotonic()
+
+        if not self._socket:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._socket.setblocking(False)
+            self._socket.connect_ex(self._resolved)
+            self._connect_deadline = now + self.TCP_TIMEOUT
+
+        _, writable, _ = select.select([], [self._socket], [], 0)
+
+        if writable:
+            error = self._socket.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+            if error:
+                raise OSError(error, os.strerror(error))
+
+            self._connected = True
+
+            return True
+
+        if now > self._connect_deadline:
+            raise OSError("connection timed out")
+
+        self.retry = now + self.POLL_INTERVAL
+
+        return False
+
+    def _write(self):
+        """Write as much of TCP frame as socket accepts
+
+        Returns:
+            True if whole frame is written
+        Raises:
+            OSError if nothing could be written for `TCP_TIMEOUT`
+        """
+
+        while self._buffer:
+            try:
+                written = self._socket.send(self._buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            self._buffer = self._buffer[written:]
+            self._write_deadline = 0
+
+        if not self._buffer:
+            return True
+
+        now = time.monotonic()
+
+        if not self._write_deadline:
+            self._write_deadline = now + self.TCP_TIMEOUT
+        elif now > self._write_deadline:
+            raise OSError("sending timed out")
+
+        self.retry = now + self.POLL_INTERVAL
+
+        return False
+
+    def _resolve(self):
+        """Look up host name in background thread, ip address is used as is
+
+        Returns:
+            True if address is resolved
+        Raises:
+            OSError if host name can't be resolved
+        """
+
+        if self._resolved:
+            return True
+
+        if self._lookup_error:
+            error, self._lookup_error = self._lookup_error, None
+
+            raise error
+
+        try:
+            socket.inet_aton(self.address)
+        except OSError:
+            pass
+        else:
+            self._resolved = (self.address, self.port)
+
+            return True
+
+        # sender sleeps until lookup thread wakes it up
+        self.retry = time.monotonic() + self.RETRY_INTERVAL
+        self._lookup = threading.Thread(target=self._look_up, name="OSC lookup %s" % self.address, daemon=True)
+        self._lookup.start()
+
+        return False
+
+    def _look_up(self):
+        """Resolve host name, called from lookup thread"""
+
+        try:
+            self._resolved = (socket.gethostbyname(self.address), self.port)
+            self.retry = 0
+        except (OSError, UnicodeError) as error:
+            self._lookup_error = OSError(str(error))
+
+        self._lookup = None
+        self._wakeup()
+
+
+class _SenderThread(QtCore.QThread):
+    """Send queued messages of OSC client"""
+
+    def __init__(self, client: _OSCClient):
+        super(_SenderThread, self).__init__()
+
+        self.running = False
+
+        self._client = client
+
+    def start(self, priority=QtCore.QThread.InheritPriority):
+        """Start sending"""
+
+        self.running = True
+
+        super(_SenderThread, self).start(priority)
+
+    def stop(self):
+        """Send remaining messages and stop"""
+
+        self.running = False
+        self._client._wakeup()
+        self.wait(1000)
+
+    def run(self):
+        """Send messages until stopped"""
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        while True:
+            items = self._client._take()
+
+            if items is None:
+                break
+
+            for destination, date, packet in items:
+                if not destination.send(sock, date, packet) and packet is not None:
+                    self._client._requeue(destination, date, packet)
+
+        sock.close()
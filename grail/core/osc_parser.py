@@ -0,0 +1,240 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.core.osc_parser
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Parse incoming OSC datagrams without copying them.
+
+    Structure of datagram is validated in one pass over type tags,
+    values of arguments are decoded only when `args` are accessed,
+    so messages which are replaced by newer ones are never decoded.
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import struct
+
+from grailkit.osc import OSCParseError, OSCImpulse, OSCColor, OSCMidi
+
+__all__ = ['parse', 'OSCMessageView', 'OSCBundleView']
+
+_BUNDLE_PREFIX = b'#bundle\x00'
+
+# seconds between NTP epoch (1900) and unix epoch (1970)
+_NTP_DELTA = 2208988800
+
+_INT = struct.Struct('>i')
+_UINT = struct.Struct('>I')
+_FLOAT = struct.Struct('>f')
+_DOUBLE = struct.Struct('>d')
+_INT64 = struct.Struct('>q')
+_TIMETAG = struct.Struct('>II')
+_BYTES = struct.Struct('>BBBB')
+
+# size of arguments with fixed length
+_FIXED_SIZE = {'i': 4, 'u': 4, 'f': 4, 'c': 4, 'r': 4, 'm': 4, 'd': 8, 'h': 8, 't': 8}
+
+# arguments without data
+_CONSTANTS = {'T': True, 'F': False, 'N': None}
+
+
+def parse(data):
+    """Parse OSC datagram
+
+    Args:
+        data (bytes): datagram
+    Returns:
+        OSCMessageView or OSCBundleView
+    Raises:
+        OSCParseError if datagram is not valid OSC packet
+    """
+
+    return _parse(data, memoryview(data), 0, len(data))
+
+
+def _parse(data, view, start, end):
+    """Parse packet which occupies data from `start` to `end`"""
+
+    if data.startswith(b'/', start, end):
+        return OSCMessageView(data, view, start, end)
+
+    if data.startswith(_BUNDLE_PREFIX, start, end):
+        return OSCBundleView(data, view, start, end)
+
+    raise OSCParseError("OSC packet should start with address or bundle prefix")
+
+
+def _string_end(data, index, end):
+    """Returns index where padded string which starts at `index` ends"""
+
+    null = data.find(b'\x00', index, end)
+
+    if null == -1:
+        raise OSCParseError("OSC string is not terminated")
+
+    # string, null and padding to 4 bytes
+    return null + 4 - (null - index) % 4
+
+
+def _timetag(seconds, fraction):
+    """Returns system time of timetag or None if it means `immediately`"""
+
+    if seconds == 0 and fraction <= 1:
+        return None
+
+    return seconds - _NTP_DELTA + fraction / 0x100000000
+
+
+class OSCMessageView:
+    """OSC message which arguments are read from datagram on demand"""
+
+    __slots__ = ('address', '_data', '_view', '_layout', '_args')
+
+    def __init__(self, data, view, start, end):
+
+        index = _string_end(data, start, end)
+
+        if index > end:
+            raise OSCParseError("Datagram is too short")
+
+        self.address = str(view[start:data.index(b'\x00', start)], 'ascii', 'replace')
+
+        self._data = data
+        self._view = view
+        self._layout = ()
+        self._args = None
+
+        # message without type tags is legit and has no arguments
+        if index >= end or data[index] != 0x2C:
+            return
+
+        tags_end = data.index(b'\x00', index)
+        tags = str(view[index + 1:tags_end], 'ascii', 'replace')
+        index = _string_end(data, index, end)
+        layout = []
+
+        # find where every argument starts, values are not decoded
+        for tag in tags:
+            size = _FIXED_SIZE.get(tag)
+
+            if size:
+                layout.append((tag, index))
+                index += size
+            elif tag == 's' or tag == 'S':
+                layout.append((tag, index))
+                index = _string_end(data, index, end)
+            elif tag == 'b':
+                if index + 4 > end:
+                    raise OSCParseError("Datagram is too short")
+
+                length = _INT.unpack_from(view, index)[0]
+                layout.append((tag, index))
+                index += 4 + length + (-length % 4)
+            elif tag in _CONSTANTS or tag == 'I':
+                layout.append((tag, index))
+            else:
+                raise OSCParseError("Unsupported OSC type tag '%s'" % tag)
+
+            if index > end:
+                raise OSCParseError("Datagram is too short")
+
+        self._layout = layout
+
+    def __iter__(self):
+
+        return iter(self.args)
+
+    def __len__(self):
+
+        return len(self._layout)
+
+    @property
+    def args(self):
+        """Returns list of arguments, decoded on first access"""
+
+        if self._args is None:
+            self._args = [self._decode(tag, index) for tag, index in self._layout]
+
+        return self._args
+
+    @property
+    def types(self):
+        """Returns string of type tags"""
+
+        return ''.join(tag for tag, _ in self._layout)
+
+    def _decode(self, tag, index):
+        """Read value of argument"""
+
+        view = self._view
+
+        if tag == 'i':
+            return _INT.unpack_from(view, index)[0]
+        elif tag == 'f':
+            return _FLOAT.unpack_from(view, index)[0]
+        elif tag == 's' or tag == 'S':
+            return str(view[index:self._data.index(b'\x00', index)], 'utf-8', 'replace')
+        elif tag == 'b':
+            length = _INT.unpack_from(view, index)[0]
+
+            return bytes(view[index + 4:index + 4 + length])
+        elif tag in _CONSTANTS:
+            return _CONSTANTS[tag]
+        elif tag == 'd':
+            return _DOUBLE.unpack_from(view, index)[0]
+        elif tag == 'h':
+            return _INT64.unpack_from(view, index)[0]
+        elif tag == 'u':
+            return _UINT.unpack_from(view, index)[0]
+        elif tag == 't':
+            return _timetag(*_TIMETAG.unpack_from(view, index))
+        elif tag == 'c':
+            return chr(view[index + 3] or view[index])
+        elif tag == 'r':
+            return OSCColor(*_BYTES.unpack_from(view, index))
+        elif tag == 'm':
+            return OSCMidi(*_BYTES.unpack_from(view, index))
+        elif tag == 'I':
+            return OSCImpulse()
+
+        return None
+
+
+class OSCBundleView:
+    """OSC bundle which elements share datagram of bundle"""
+
+    __slots__ = ('time', '_elements')
+
+    def __init__(self, data, view, start, end):
+
+        index = start + len(_BUNDLE_PREFIX)
+
+        if index + 8 > end:
+            raise OSCParseError("Datagram is too short")
+
+        # system time when bundle should be executed or None if immediately
+        self.time = _timetag(*_TIMETAG.unpack_from(view, index))
+        self._elements = []
+
+        index += 8
+
+        while index < end:
+            if index + 4 > end:
+                raise OSCParseError("Datagram is too short")
+
+            size = _INT.unpack_from(view, index)[0]
+            index += 4
+
+            if size <= 0 or index + size > end:
+                raise OSCParseError("Bundle element has wrong size")
+
+            self._elements.append(_parse(data, view, index, index + size))
+            index += size
+
+    def __iter__(self):
+
+        return iter(self._elements)
+
+    def __len__(self):
+
+        return len(self._elements)
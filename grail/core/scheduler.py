@@ -0,0 +1,206 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.core.scheduler
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Execute cues at absolute deadlines of monotonic clock.
+
+    Timing thread sleeps until deadline is close, waits the rest precisely
+    and posts callback to GUI thread. Busy GUI delays delivery of one callback,
+    but deadlines of following cues are not shifted by it.
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+from grail.qt import QtCore, QtSignal
+
+__all__ = ['CueScheduler']
+
+
+class CueScheduler(QtCore.QObject):
+    """Call functions in GUI thread at given time of `clock`"""
+
+    # seconds before deadline when timing thread stops sleeping and waits precisely
+    SPIN_TIME = 0.002
+
+    def __init__(self, parent=None):
+        super(CueScheduler, self).__init__(parent)
+
+        self._condition = threading.Condition()
+        self._queue = []
+        self._pending = {}
+        self._sequence = itertools.count(1)
+        self._running = False
+
+        self._executed = 0
+        self._error_total = 0
+        self._error_max = 0
+
+        self._thread = _TimingThread(self)
+        self._thread.due.connect(self._execute)
+
+    @staticmethod
+    def clock():
+        """Returns seconds of monotonic clock with highest available resolution"""
+
+        return time.perf_counter()
+
+    @property
+    def statistics(self):
+        """Returns number of executed calls and their error in milliseconds"""
+
+        return {'executed': self._executed,
+                'pending': len(self._pending),
+                'error_mean': self._error_total / self._executed * 1000 if self._executed else 0,
+                'error_max': self._error_max * 1000}
+
+    def schedule(self, deadline, fn, *args, group=None, name=''):
+        """Call `fn` with arguments at given time
+
+        Args:
+            deadline (float): time of `clock` when function should be called
+            fn (callable): function called in GUI thread
+            group: calls with same group can be cancelled together
+            name (str): name used in log
+        Returns:
+            handle of scheduled call
+        """
+
+        handle = next(self._sequence)
+
+        with self._condition:
+            self._pending[handle] = (deadline, fn, args, group, name)
+            heapq.heappush(self._queue, (deadline, handle))
+
+            if not self._running:
+                self._running = True
+                self._thread.start(QtCore.QThread.TimeCriticalPriority)
+
+            self._condition.notify()
+
+        return handle
+
+    def cancel(self, handle):
+        """Cancel scheduled call"""
+
+        with self._condition:
+            self._pending.pop(handle, None)
+            self._condition.notify()
+
+    def cancel_group(self, group):
+        """Cancel all scheduled calls of group"""
+
+        with self._condition:
+            for handle in [handle for handle, item in self._pending.items() if item[3] == group]:
+                del self._pending[handle]
+
+            self._condition.notify()
+
+    def pending(self, group=None):
+        """Returns number of scheduled calls, of given group or all"""
+
+        with self._condition:
+            if group is None:
+                return len(self._pending)
+
+            return sum(1 for item in self._pending.values() if item[3] == group)
+
+    def close(self):
+        """Cancel all calls and stop timing thread"""
+
+        with self._condition:
+            self._pending = {}
+            self._queue = []
+            self._running = False
+            self._condition.notify()
+
+        self._thread.wait(1000)
+
+    def _take(self):
+        """Wait until deadline of first call comes
+
+        Returns:
+            handle of call or None if scheduler is closed
+        """
+
+        while True:
+            with self._condition:
+                while True:
+                    if not self._running:
+                        return None
+
+                    # skip cancelled calls
+                    while self._queue and self._queue[0][1] not in self._pending:
+                        heapq.heappop(self._queue)
+
+                    if not self._queue:
+                        self._condition.wait()
+                        continue
+
+                    deadline, handle = self._queue[0]
+                    delay = deadline - self.clock()
+
+                    if delay <= self.SPIN_TIME:
+                        break
+
+                    self._condition.wait(delay - self.SPIN_TIME)
+
+            # sleep of condition is not precise, yield until deadline
+            while self.clock() < deadline:
+                time.sleep(0)
+
+            with self._condition:
+                # call could be cancelled or earlier one scheduled while waiting
+                if self._queue and self._queue[0][1] == handle and handle in self._pending:
+                    heapq.heappop(self._queue)
+
+                    return handle
+
+    def _execute(self, handle):
+        """Call function in GUI thread"""
+
+        with self._condition:
+            item = self._pending.pop(handle, None)
+
+        if item is None:
+            return
+
+        deadline, fn, args, group, name = item
+        error = self.clock() - deadline
+
+        self._executed += 1
+        self._error_total += abs(error)
+        self._error_max = max(self._error_max, abs(error))
+
+        logging.info("%s executed %+.3f ms from schedule" % (name or fn.__name__, error * 1000))
+
+        fn(*args)
+
+
+class _TimingThread(QtCore.QThread):
+    """Wait for deadlines of scheduler"""
+
+    due = QtSignal(int)
+
+    def __init__(self, scheduler):
+        super(_TimingThread, self).__init__()
+
+        self._scheduler = scheduler
+
+    def run(self):
+        """Post calls to GUI thread until scheduler is closed"""
+
+        while True:
+            # noinspection PyProtectedMember
+            handle = self._scheduler._take()
+
+            if handle is None:
+                break
+
+            self.due.emit(handle)
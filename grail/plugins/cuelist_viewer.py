@@ -9,12 +9,12 @@
     :license: GNU, see LICENSE for more details.
 """
 import re
+import weakref
 from functools import wraps
 
 from grailkit.dna import DNA, CueEntity
-from grailkit.osc import OSCMessage, OSCBundle
 
-from grail.core import Viewer
+from grail.core import Viewer, CuelistTree, CuelistOrder, connect_slot, disconnect_slot
 from grail.ui import PropertiesView
 from grail.qt import *
 
@@ -499,31 +499,33 @@ class CuelistViewer(Viewer):
     name = 'Cuelist'
     author = 'Oleksii Lytvyn'
     description = 'Manage cuelists'
-    single_instance = True
+
+    # viewer which was used last, entities are added to its cuelist
+    _active = None
 
     def __init__(self, *args):
         super(CuelistViewer, self).__init__(*args)
 
         self._locked = False
-        self._cuelist_id = self.project.settings().get('cuelist/current', default=0)
+        self._cuelist_id = self.get('cuelist', default=self.project.settings().get('cuelist/current', default=0))
         self._dialog = CuelistDialog()
         self._dialog.selected.connect(self.cuelist_selected)
         self._cuedialog = CueDialog(self)
         self._selected_id = None
-        self._update_lock = False
+        self._player = None
 
-        self._cue_timer = QtCore.QTimer()
-        self._cue_timer.setSingleShot(True)
-        self._cue_timer.timeout.connect(self._cue_timer_execute)
+        # Track project changes, slots of viewers are named to not replace each other
+        self._project_slots = ((self.project.entity_added, self._update_changed),
+                               (self.project.entity_changed, self._update_changed),
+                               (self.project.entity_removed, self._update_removed),
+                               (self.project.property_changed, self._update_property))
 
-        # Track project changes
-        self.project.entity_changed.connect(self._update_changed)
-        self.project.entity_removed.connect(self._update_removed)
-        self.project.property_changed.connect(self._update_property)
+        for signal, fn in self._project_slots:
+            connect_slot(signal, fn)
 
         # Application signals
-        self.app.signals.connect('/app/close', self._close)
-        self.app.signals.connect('/cuelist/add', self._add_entity)
+        self.connect_signal('/app/close', self._close)
+        self.connect_signal('/cuelist/add', self._add_entity)
 
         self.__ui__()
         self.cuelist_selected(self._cuelist_id)
@@ -537,10 +539,13 @@ class CuelistViewer(Viewer):
         self._ui_layout.setSpacing(0)
         self._ui_layout.setContentsMargins(0, 0, 0, 0)
 
-        self._ui_tree = TreeWidget()
+        self._model = CuelistModel(self.project)
+        self._model.rowsInserted.connect(self._update_label)
+        self._model.rowsRemoved.connect(self._update_label)
+
+        self._ui_tree = TreeView()
         self._ui_tree.setObjectName('CuelistViewer_tree')
-        self._ui_tree.setHeaderHidden(True)
-        self._ui_tree.setHeaderLabels(['Icon', 'Number', 'Name'])
+        self._ui_tree.setModel(self._model)
         self._ui_tree.setColumnWidth(0, 0)
         self._ui_tree.setColumnWidth(1, 48)
         # todo: add setting to sho/hide first column
@@ -548,11 +553,11 @@ class CuelistViewer(Viewer):
 
         self._ui_tree.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self._ui_tree.customContextMenuRequested.connect(self._context_menu)
-        self._ui_tree.itemExpanded.connect(self.item_expanded)
-        self._ui_tree.itemCollapsed.connect(self.item_collapsed)
-        self._ui_tree.itemClicked.connect(self.item_clicked)
-        self._ui_tree.itemDoubleClicked.connect(self.item_double_clicked)
-        self._ui_tree.currentItemChanged.connect(self.item_clicked)
+        self._ui_tree.expanded.connect(self.item_expanded)
+        self._ui_tree.collapsed.connect(self.item_collapsed)
+        self._ui_tree.clicked.connect(self.item_clicked)
+        self._ui_tree.doubleClicked.connect(self.item_double_clicked)
+        self._ui_tree.selectionModel().currentChanged.connect(self.item_clicked)
         self._ui_tree.keyPressEvent = self._key_event
 
         # Empty
@@ -647,58 +652,53 @@ class CuelistViewer(Viewer):
             cuelist.create("Untitled item", entity_type=DNA.TYPE_CUE)
 
     @guard_lock
-    def item_delete(self, item):
+    def item_delete(self, index):
         """Remove cue item menu_action
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        if not item:
-            return False
-
-        above = self._ui_tree.itemAbove(item)
+        entity = self._model.entity(index)
 
-        if above:
-            self._selected_id = above.object().id
+        if not entity:
+            return False
 
-        self._update_lock = True
+        above = self._model.entity(self._ui_tree.indexAbove(index))
 
-        # remove selected item
-        item.object().delete()
+        # remove selected item, rows are removed by model
+        entity.delete()
 
-        self._update_lock = False
-        self._update()
+        if above:
+            self._select(above.id)
 
     @guard_lock
-    def item_edit(self, item):
+    def item_edit(self, index):
         """Edit cue menu_action
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        if not item:
-            return False
-
-        entity = item.object()
+        entity = self._model.entity(index)
 
         if entity:
             self._cuedialog.set_entity(entity)
             self._cuedialog.showWindow()
 
     @guard_lock
-    def item_duplicate(self, item):
+    def item_duplicate(self, index):
         """Duplicate cue menu_action
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        if not item:
+        entity = self._model.entity(index)
+
+        if not entity:
             return False
 
-        entity = item.object()
         new_entity = entity.parent.insert(entity.index + 1, entity)
 
         match = re.match('^([sw]+)copy( ([d]+))?$', new_entity.name, re.MULTILINE | re.IGNORECASE)
@@ -715,82 +715,83 @@ class CuelistViewer(Viewer):
         else:
             new_entity.name = entity.name + " copy"
 
-        self._selected_id = new_entity.id
+        self._select(new_entity.id)
 
     @guard_lock
-    def item_color(self, item, color):
+    def item_color(self, index, color):
         """Change cue color menu_action
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
             color (int): cue color constant
         """
 
-        entity = item.object()
-        self._selected_id = entity.id
+        entity = self._model.entity(index)
 
         if isinstance(entity, CueEntity) and color in CueEntity.COLORS:
             entity.color = color
 
-    def item_clicked(self, item):
+    def item_clicked(self, index):
         """Preview cue text
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        if not item:
+        entity = self._model.entity(index)
+
+        if not entity:
             return False
 
-        self._selected_id = item.object().id
+        self._selected_id = entity.id
+        self._activate()
 
-        self.emit_signal('!node/selected', item.object().id)
-        self.emit_signal('!cue/preview', item.object())
+        self.emit_signal('!node/selected', entity.id)
+        self.emit_signal('!cue/preview', entity)
 
-    def item_double_clicked(self, item):
+    def item_double_clicked(self, index):
         """Send cue text
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        if not item:
+        entity = self._model.entity(index)
+
+        if not entity:
             return False
 
-        self._selected_id = item.object().id
+        self._selected_id = entity.id
 
-        self._cue_execute(item.object())
+        self._cue_execute(entity)
 
-    def item_expanded(self, item):
+    def item_expanded(self, index):
         """Tree item expanded
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        self.item_toggle(item, True)
+        self.item_toggle(index, True)
 
-    def item_collapsed(self, item):
+    def item_collapsed(self, index):
         """Tree item collapsed
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
         """
 
-        self.item_toggle(item, False)
+        self.item_toggle(index, False)
 
-    def item_toggle(self, item, flag=False):
+    def item_toggle(self, index, flag=False):
         """Change item collapsed/expanded state
 
         Args:
-            item (QTreeWidgetItem): tree item
+            index (QModelIndex): index of cue in tree
             flag (bool): True if expanded
         """
 
-        if not item:
-            return
-
-        item.object().set('expanded', flag)
+        self._model.set_expanded(index, flag)
 
     def cuelist_selected(self, cuelist_id=0):
         """Open cuelist in viewer
@@ -799,13 +800,20 @@ class CuelistViewer(Viewer):
             cuelist_id (int): cuelist id
         """
 
-        if self.is_destroyed or self._update_lock:
+        if self.is_destroyed:
             return False
 
         self._cuelist_id = cuelist_id
         cuelist = self.project.cuelist(cuelist_id)
-        dna = self.project.dna
-        selected_item = None
+
+        # cuelist which is not shown keeps running
+        if self._player:
+            self._player.moved.disconnect(self._select)
+            self._player.detach(self._model)
+            self._player = None
+
+        self._model.set_cuelist(cuelist)
+        self._activate()
 
         if cuelist is None:
             self._ui_label.setText("...")
@@ -813,112 +821,72 @@ class CuelistViewer(Viewer):
 
             return False
 
-        self._ui_stack.setCurrentIndex(1)
-        self._ui_tree.clear()
+        self._player = self.app.cues.player(cuelist_id)
+        self._player.attach(self._model)
+        self._player.moved.connect(self._select)
+        self._selected_id = self._player.playhead
 
+        self._ui_stack.setCurrentIndex(1)
+        self.set('cuelist', cuelist_id)
         self.project.settings().set('cuelist/current', cuelist_id)
-        self._ui_label.setText("%s <small>(%d cues)</small>" % (cuelist.name, len(cuelist)))
-
-        def create_item(_entity):
-            """Create tree item from entity"""
-
-            name = _entity.name
-
-            _item = QtWidgets.QTreeWidgetItem(_entity)
-            # todo: Add number to song entity or add CueEntity instead
-            _item.setText(0, "")
-            _item.setText(1, str(_entity.number) if hasattr(_entity, 'number') else "")
-            _item.setText(2, name if len(name) < 50 else "%s..." % name[:50])
 
-            if isinstance(_entity, CueEntity):
-                if _entity.color != CueEntity.COLOR_DEFAULT:
-                    bg = QtGui.QBrush(QtGui.QColor(_entity.color))
-                    fg = QtGui.QBrush(QtGui.QColor("#222" if _entity.color == CueEntity.COLOR_YELLOW else "#fff"))
+        self._update_label()
+        self._select(self._selected_id)
 
-                    _item.setBackground(0, bg)
-                    _item.setForeground(0, fg)
-                    _item.setBackground(1, bg)
-                    _item.setForeground(1, fg)
+    def _select(self, entity_id):
+        """Make cue current in tree, if it is shown"""
 
-                if _entity.follow == CueEntity.FOLLOW_OFF:
-                    _item.setIcon(1, Icon(':/rc/follow-off.png'))
-                elif _entity.follow == CueEntity.FOLLOW_ON:
-                    _item.setIcon(1, Icon(':/rc/follow-on.png'))
-                elif _entity.follow == CueEntity.FOLLOW_CONTINUE:
-                    _item.setIcon(1, Icon(':/rc/follow-cont.png'))
+        index = self._model.index_of(entity_id)
 
-            return _item
-
-        def add_childs(tree_item, parent_id):
-            """Add childs to tree item"""
-
-            nonlocal selected_item
-            nonlocal self
-
-            for child in dna.childs(parent_id):
-                child_item = create_item(child)
-                add_childs(child_item, child.id)
+        if index.isValid():
+            self._ui_tree.setCurrentIndex(index)
 
-                tree_item.addChild(child_item)
-                child_item.setExpanded(bool(child.get('expanded', default=False)))
+    def _update_label(self, *_):
+        """Show name of cuelist and number of cues"""
 
-                if child.id == self._selected_id:
-                    selected_item = child_item
+        cuelist = self._model.cuelist()
 
-        for entity in cuelist.cues():
-            item = create_item(entity)
+        if cuelist:
+            self._ui_label.setText("%s <small>(%d cues)</small>" % (cuelist.name, self._model.rowCount()))
 
-            add_childs(item, entity.id)
+    def _activate(self):
+        """Make this viewer receive entities added to cuelist"""
 
-            self._ui_tree.addTopLevelItem(item)
-            item.setExpanded(bool(entity.get('expanded', default=False)))
+        CuelistViewer._active = weakref.ref(self)
 
-            if entity.id == self._selected_id:
-                selected_item = item
+    def _is_active(self):
+        """Returns True if entities added to cuelist should go to this viewer"""
 
-        if selected_item:
-            index = self._ui_tree.indexFromItem(selected_item)
-            self._ui_tree.setCurrentIndex(index)
+        active = CuelistViewer._active() if CuelistViewer._active else None
 
-    def _update(self, *_):
-        """Internal update"""
+        # any viewer adds entities if last used one is closed
+        return active is None or active is self or active.is_destroyed
 
-        if not self._update_lock:
-            self.cuelist_selected(self._cuelist_id)
+    def _update_changed(self, entity_id):
 
-    def _cue_contains(self, entity_id):
+        self._model.update_entity(entity_id)
 
         if entity_id == self._cuelist_id:
-            return True
-
-        return self.project.dna.contains(self._cuelist_id, entity_id)
-
-    def _update_changed(self, entity_id):
-
-        if self._cue_contains(entity_id):
-            self._update()
+            self._update_label()
 
     def _update_removed(self, entity_id):
 
-        if self._cue_contains(entity_id):
-            self._update()
+        # removed entity is not known, only its parent
+        self._model.update_childs(entity_id)
 
     def _update_property(self, entity_id, key, value):
         """Update list when cue's properties changed"""
 
-        if key == 'color' or key == 'follow':
-            self._update()
+        self._model.update_property(entity_id, key)
 
     @guard_lock
     def _add_entity(self, entity):
         """Add entity to cuelist"""
 
-        self._update_lock = True
-
         cuelist_id = self._cuelist_id
         cuelist = self.project.cuelist(cuelist_id)
 
-        if not entity or not cuelist:
+        if not entity or not cuelist or not self._is_active():
             return False
 
         if entity.type == DNA.TYPE_SONG:
@@ -934,42 +902,39 @@ class CuelistViewer(Viewer):
             cuelist.create(name="%s\n%s" % (entity.text, entity.reference),
                            entity_type=DNA.TYPE_CUE)
 
-        self._update_lock = False
-        self._update()
-
     def _context_menu(self, pos):
         """Context menu on cue item"""
 
-        item = self._ui_tree.itemAt(pos)
+        index = self._ui_tree.indexAt(pos)
 
-        if not item:
+        if not index.isValid():
             return False
 
         def create_color_action(this, action_index, name, menu_ref):
             """Create, connect and return QAction."""
 
             action = QtWidgets.QAction(name, menu_ref)
-            action.triggered.connect(lambda: this.item_color(item, CueEntity.COLORS[action_index]))
+            action.triggered.connect(lambda: this.item_color(index, CueEntity.COLORS[action_index]))
 
             return action
 
         menu = QtWidgets.QMenu("Context Menu", self)
 
         delete_action = QtWidgets.QAction('Delete Cue', menu)
-        delete_action.triggered.connect(lambda: self.item_delete(item))
+        delete_action.triggered.connect(lambda: self.item_delete(index))
 
         edit_action = QtWidgets.QAction('Edit Cue', menu)
-        edit_action.triggered.connect(lambda: self.item_edit(item))
+        edit_action.triggered.connect(lambda: self.item_edit(index))
 
         duplicate_action = QtWidgets.QAction('Duplicate Cue', menu)
-        duplicate_action.triggered.connect(lambda: self.item_duplicate(item))
+        duplicate_action.triggered.connect(lambda: self.item_duplicate(index))
 
         menu.addAction(edit_action)
         menu.addAction(duplicate_action)
         menu.addSeparator()
 
-        for index, color_name in enumerate(CueEntity.COLOR_NAMES):
-            menu.addAction(create_color_action(self, index, color_name, menu))
+        for color_index, color_name in enumerate(CueEntity.COLOR_NAMES):
+            menu.addAction(create_color_action(self, color_index, color_name, menu))
 
         menu.addSeparator()
         menu.addAction(delete_action)
@@ -979,141 +944,541 @@ class CuelistViewer(Viewer):
     def _key_event(self, event):
         """Process keyboard events of Tree widget"""
 
-        item = self._ui_tree.currentItem()
+        index = self._ui_tree.currentIndex()
         key = event.key()
 
-        if item:
+        if index.isValid():
             if key == QtCore.Qt.Key_Return:
-                self.item_double_clicked(item)
+                self.item_double_clicked(index)
                 return
             elif key == QtCore.Qt.Key_Delete or key == QtCore.Qt.Key_Backspace:
-                self.item_delete(item)
+                self.item_delete(index)
                 return
             elif key == QtCore.Qt.Key_Up:
-                self.item_clicked(item)
+                self.item_clicked(index)
             elif key == QtCore.Qt.Key_Down:
-                self.item_clicked(item)
+                self.item_clicked(index)
 
         # call default event handler
-        QtWidgets.QTreeWidget.keyPressEvent(self._ui_tree, event)
+        QtWidgets.QTreeView.keyPressEvent(self._ui_tree, event)
 
-    def _cue_timer_execute(self):
+    def _cue_execute(self, cue=None, wait=0):
+        """Execute cue and cues which continue it, other cuelists keep running"""
 
-        cue = self._cue_timer.cue
+        if not cue or not self._player:
+            return False
 
-        self.emit_signal('!cue/execute', cue)
-        self._osc_execute(cue)
+        self._selected_id = cue.id
+        self._activate()
+        self._player.go(cue, wait)
 
-        # Do not execute next cue
-        if hasattr(cue, 'follow') and cue.follow == CueEntity.FOLLOW_OFF:
-            return False
+        # highlight what is currently running
+        self._select(self._selected_id)
 
-        next_cue = None
+    def closeEvent(self, event):
+        """Stop tracking project and cuelist player when viewer is removed"""
 
-        # go inside cue
-        if cue.has_childs():
-            next_cue = cue.childs()[0]
-        # find cue beside or in parents
-        else:
-            traverse_cond = True
-            traverse_cue = cue
+        for signal, fn in self._project_slots:
+            disconnect_slot(signal, fn)
 
-            while traverse_cond:
-                parent_cues = self.project.dna.childs(traverse_cue.parent_id)
-                index = 0
+        self._project_slots = ()
 
-                # find next cue in parent list
-                for item in parent_cues:
-                    index += 1
+        if self._player:
+            self._player.moved.disconnect(self._select)
+            self._player.detach(self._model)
+            self._player = None
 
-                    if item.id == traverse_cue.id and index < len(parent_cues):
-                        next_cue = parent_cues[index]
-                        traverse_cond = False
+        super(CuelistViewer, self).closeEvent(event)
 
-                        break
+    def _close(self):
+        """Close child dialogs"""
 
-                # find in parent list
-                if index == len(parent_cues):
-                    traverse_cue = traverse_cue.parent
+        self._cuedialog.close()
+        self._dialog.close()
 
-        # Execute next cue
-        if next_cue and cue.follow == CueEntity.FOLLOW_CONTINUE:
-            # post wait
-            self._cue_execute(next_cue, cue.post_wait)
 
-    def _cue_execute(self, cue=None, wait=0):
-        """Execute cue"""
+class CuelistNode:
+    """Entity of cuelist as a row of tree model"""
 
-        if not cue:
-            return False
+    __slots__ = ('id', 'entity', 'parent', 'childs', 'expanded', 'values', 'position')
 
-        self._selected_id = cue.id
+    def __init__(self, entity, parent=None, position=0):
+
+        self.id = entity.id
+        self.entity = entity
+        self.parent = parent
+        self.childs = []
+        self.expanded = False
+        # number, name, color and follow, read from entity when row is painted
+        self.values = None
+        # last known row, childs are renumbered after model changes them
+        self.position = position
+
+    def row(self):
+        """Returns row of node inside parent"""
+
+        if not self.parent:
+            return 0
+
+        childs = self.parent.childs
+
+        # siblings were inserted or removed and rows are not renumbered yet
+        if self.position >= len(childs) or childs[self.position] is not self:
+            self.position = childs.index(self)
+
+        return self.position
 
-        pause = 0
 
-        if hasattr(cue, "pre_wait"):
-            pause = (cue.pre_wait + wait) * 1000
+class CuelistModel(QtCore.QAbstractItemModel):
+    """Tree model of cuelist, rows are inserted, moved and removed one by one as project changes"""
 
-        # pre wait
-        self._cue_timer.cue = cue
-        self._cue_timer.stop()
-        self._cue_timer.start(pause)
+    COLUMNS = ('Icon', 'Number', 'Name')
 
-        # update list show what is currently running
-        self._update()
+    # role of expanded flag, as saved in entity
+    ExpandedRole = QtCore.Qt.UserRole + 1
 
-    def _osc_execute(self, cue):
-        """Execute cue and send OSC bundle
+    def __init__(self, project, parent=None):
+        super(CuelistModel, self).__init__(parent)
 
-        Send bundle with all valid OSC properties + entity info
+        self._project = project
+        self._dna = project.dna
+        self._root = None
+        self._nodes = {}
+        self._order = CuelistOrder()
+        self._icons = {CueEntity.FOLLOW_OFF: Icon(':/rc/follow-off.png'),
+                       CueEntity.FOLLOW_ON: Icon(':/rc/follow-on.png'),
+                       CueEntity.FOLLOW_CONTINUE: Icon(':/rc/follow-cont.png')}
+
+    def cuelist(self):
+        """Returns cuelist entity shown by model"""
+
+        return self._root.entity if self._root else None
+
+    def set_cuelist(self, cuelist):
+        """Show given cuelist, all rows are created again
+
+        Args:
+            cuelist (CuelistEntity): cuelist or None
         """
 
-        bundle = OSCBundle()
-        bundle.add(OSCMessage(address='/cue/id', args=[cue.id]))
-        bundle.add(OSCMessage(address='/cue/type', args=[cue.type]))
-        bundle.add(OSCMessage(address='/cue/parent', args=[cue.parent]))
+        self.beginResetModel()
+
+        self._nodes = {}
+        self._root = self._tree(cuelist.id, None) if cuelist else None
+        self._order = CuelistOrder(entity_id for node in (self._root.childs if self._root else ())
+                                   for entity_id in self._walk(node))
+
+        self.endResetModel()
+
+    def order(self):
+        """Returns playback order of cues"""
+
+        return self._order
+
+    def entity(self, index):
+        """Returns entity of given index or None"""
+
+        return index.internalPointer().entity if index.isValid() else None
+
+    def next_entity(self, entity_id):
+        """Returns entity played after given one, it's found without database access"""
+
+        node = self._nodes.get(self._order.next(entity_id))
+
+        return node.entity if node else None
+
+    def index_of(self, entity_id):
+        """Returns index of entity or invalid index if entity isn't shown"""
+
+        node = self._nodes.get(entity_id)
+
+        if not node or node is self._root:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(node.row(), 0, node)
+
+    def set_expanded(self, index, flag):
+        """Save expanded state of item"""
+
+        if not index.isValid():
+            return
+
+        node = index.internalPointer()
+
+        if node.expanded != flag:
+            node.expanded = flag
+            node.entity.set('expanded', flag)
+
+    def update_entity(self, entity_id):
+        """Reflect change of entity, row is updated, moved, inserted or removed"""
+
+        if not self._root:
+            return
+
+        node = self._nodes.get(entity_id)
+        entity = self._dna.entity(entity_id)
+
+        if node is self._root:
+            node.entity = entity or node.entity
+
+            return
+
+        # removal of entity is handled by parent
+        if not entity:
+            return
+
+        parent = self._nodes.get(entity.parent_id)
+
+        if node and node.parent is parent and node.entity.index == entity.index:
+            node.entity = entity
+            node.values = None
+
+            self._changed(node)
+        elif parent:
+            self._sync(parent)
+        elif node:
+            # entity moved out of cuelist
+            self._remove(node)
+
+    def update_childs(self, entity_id):
+        """Reflect removal of child entities"""
+
+        node = self._nodes.get(entity_id)
+
+        if node:
+            self._sync(node)
+
+    def update_property(self, entity_id, key):
+        """Update row if property shown by tree is changed"""
+
+        node = self._nodes.get(entity_id)
+
+        if node and node is not self._root and key in ('number', 'color', 'follow'):
+            node.values = None
+
+            self._changed(node)
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
 
-        name = OSCMessage(address='/cue/name')
-        # Blob value cannot be empty, so we replace it with one space
-        name.add(bytes(cue.name if len(cue.name) > 0 else " ", 'utf-8'))
-        bundle.add(name)
+        node = parent.internalPointer() if parent.isValid() else self._root
 
-        for key, value in cue.properties().items():
-            # check if property name is valid OSC address pattern
-            if not OSCMessage.is_valid_address(key):
+        if not node or row < 0 or row >= len(node.childs) or column < 0 or column >= len(self.COLUMNS):
+            return QtCore.QModelIndex()
+
+        return self.createIndex(row, column, node.childs[row])
+
+    def parent(self, index):
+
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        node = index.internalPointer().parent
+
+        if not node or node is self._root:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(node.row(), 0, node)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        if parent.column() > 0:
+            return 0
+
+        node = parent.internalPointer() if parent.isValid() else self._root
+
+        return len(node.childs) if node else 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.COLUMNS[section]
+
+        return None
+
+    def flags(self, index):
+
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | \
+            QtCore.Qt.ItemIsDragEnabled | QtCore.Qt.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+
+        return QtCore.Qt.MoveAction
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        if not index.isValid():
+            return None
+
+        node = index.internalPointer()
+        column = index.column()
+
+        if role == self.ExpandedRole:
+            return node.expanded
+
+        if node.values is None:
+            node.values = self._values(node.entity)
+
+        number, name, color, follow = node.values
+
+        if role == QtCore.Qt.DisplayRole:
+            if column == 1:
+                return number
+            elif column == 2:
+                return name if len(name) < 50 else "%s..." % name[:50]
+        elif role == QtCore.Qt.BackgroundRole:
+            if column < 2 and color and color != CueEntity.COLOR_DEFAULT:
+                return QtGui.QBrush(QtGui.QColor(color))
+        elif role == QtCore.Qt.ForegroundRole:
+            if column < 2 and color and color != CueEntity.COLOR_DEFAULT:
+                return QtGui.QBrush(QtGui.QColor("#222" if color == CueEntity.COLOR_YELLOW else "#fff"))
+        elif role == QtCore.Qt.DecorationRole:
+            if column == 1:
+                return self._icons.get(follow)
+
+        return None
+
+    def _values(self, entity, tree=None):
+        """Returns values of entity shown in tree, read from loaded tree if given"""
+
+        if not isinstance(entity, CueEntity):
+            return "", entity.name, None, None
+
+        if tree:
+            # todo: Add number to song entity or add CueEntity instead
+            return (str(tree.get(entity.id, 'number', entity.index)), entity.name,
+                    tree.get(entity.id, 'color', CueEntity.COLOR_DEFAULT),
+                    tree.get(entity.id, 'follow', CueEntity.FOLLOW_OFF))
+
+        return str(entity.number), entity.name, entity.color, entity.follow
+
+    def _tree(self, entity_id, parent):
+        """Create node of entity and nodes of all nested entities, they are loaded at once"""
+
+        tree = CuelistTree(self._project, entity_id)
+        entity = tree.entity(entity_id)
+
+        return self._node(tree, entity, parent, 0) if entity else None
+
+    def _node(self, tree, entity, parent, position):
+        """Create node of entity and nodes of its childs"""
+
+        node = CuelistNode(entity, parent, position)
+        node.values = self._values(entity, tree)
+        node.childs = [self._node(tree, child, node, row) for row, child in enumerate(tree.childs(entity.id))]
+        node.expanded = bool(node.childs and parent and tree.get(entity.id, 'expanded', False))
+
+        self._nodes[node.id] = node
+
+        return node
+
+    def _index(self, node):
+        """Returns index of node, root node has invalid index"""
+
+        if node is self._root:
+            return QtCore.QModelIndex()
+
+        return self.createIndex(node.row(), 0, node)
+
+    def _changed(self, node):
+        """Notify views about changed row"""
+
+        row = node.row()
+
+        self.dataChanged.emit(self.createIndex(row, 0, node), self.createIndex(row, len(self.COLUMNS) - 1, node))
+
+    def _walk(self, node):
+        """Returns identifiers of node and all nested nodes in order of playback"""
+
+        yield node.id
+
+        for child in node.childs:
+            yield from self._walk(child)
+
+    def _span(self, node):
+        """Returns first and last identifier of node and nested nodes in playback order"""
+
+        last = node
+
+        while last.childs:
+            last = last.childs[-1]
+
+        return node.id, last.id
+
+    def _preceding(self, parent, row):
+        """Returns identifier of cue played before row inserted into parent"""
+
+        if row > 0:
+            return self._span(parent.childs[row - 1])[1]
+
+        return None if parent is self._root else parent.id
+
+    def _forget(self, node):
+        """Remove node and its childs from lookup"""
+
+        self._nodes.pop(node.id, None)
+
+        for child in node.childs:
+            self._forget(child)
+
+    def _remove(self, node):
+        """Remove row of node"""
+
+        parent = node.parent
+        row = node.row()
+
+        self.beginRemoveRows(self._index(parent), row, row)
+        del parent.childs[row]
+        self._order.unlink(*self._span(node))
+        self._forget(node)
+        self._renumber(parent, row)
+        self.endRemoveRows()
+
+    def _renumber(self, parent, first=0):
+        """Update rows of childs starting from given one"""
+
+        childs = parent.childs
+
+        for row in range(first, len(childs)):
+            childs[row].position = row
+
+    def _sync(self, parent):
+        """Make childs of node match childs of entity in project"""
+
+        entities = self._dna.childs(parent.id)
+        ids = set(entity.id for entity in entities)
+
+        for node in reversed(parent.childs):
+            if node.id not in ids:
+                self._remove(node)
+
+        parent_index = self._index(parent)
+        childs = parent.childs
+        # range of rows which changed position, rows before `row` are final
+        changed = []
+
+        for row, entity in enumerate(entities):
+            if row < len(childs) and childs[row].id == entity.id:
+                node = childs[row]
+
+                # number of cue defaults to its index
+                if node.entity.index != entity.index:
+                    node.values = None
+                    changed = [changed[0] if changed else row, row]
+
+                node.entity = entity
                 continue
 
-            bundle.add(OSCMessage(address=key, args=[value]))
+            node = self._nodes.get(entity.id)
 
-        osc_out = self.app.osc.output
-        osc_out.send(bundle)
+            if node is None:
+                node = self._tree(entity.id, parent)
+                node.position = row
 
-    def _close(self):
-        """Close child dialogs"""
+                self.beginInsertRows(parent_index, row, row)
+                childs.insert(row, node)
+                self._order.link(list(self._walk(node)), self._preceding(parent, row))
+                self.endInsertRows()
+            else:
+                source = node.parent
+                source_row = node.row()
+                source_index = self._index(source)
+                moved = self.beginMoveRows(source_index, source_row, source_row, parent_index, row)
 
-        self._cuedialog.close()
-        self._dialog.close()
+                # views refuse some moves, row is removed and inserted again
+                if not moved:
+                    self.beginRemoveRows(source_index, source_row, source_row)
+
+                del source.childs[source_row]
+                ids = self._order.unlink(*self._span(node))
+
+                if source is not parent:
+                    self._renumber(source, source_row)
+
+                if not moved:
+                    self.endRemoveRows()
+                    self.beginInsertRows(self._index(parent), row, row)
+
+                childs.insert(row, node)
+                node.parent = parent
+                node.entity = entity
+                node.position = row
+                self._order.link(ids, self._preceding(parent, row))
+
+                if moved:
+                    self.endMoveRows()
+                else:
+                    self.endInsertRows()
 
+        self._renumber(parent)
 
-class TreeWidget(QtWidgets.QTreeWidget):
-    """Tree widget used in CuelistViewer"""
+        if changed:
+            first, last = changed
+
+            self.dataChanged.emit(self.createIndex(first, 0, childs[first]),
+                                  self.createIndex(last, len(self.COLUMNS) - 1, childs[last]))
+
+
+class TreeView(QtWidgets.QTreeView):
+    """Tree view used in CuelistViewer"""
 
     def __init__(self, *args):
-        super(TreeWidget, self).__init__(*args)
+        super(TreeView, self).__init__(*args)
+
+    def setModel(self, model):
+        """Set model and restore expanded items when rows appear"""
+
+        super(TreeView, self).setModel(model)
+
+        model.modelReset.connect(lambda: self._expand(QtCore.QModelIndex(), 0, model.rowCount() - 1))
+        model.rowsInserted.connect(self._expand)
+
+    def _expand(self, parent, first, last):
+        """Expand rows which were expanded by user"""
+
+        model = self.model()
+
+        for row in range(first, last + 1):
+            index = model.index(row, 0, parent)
+
+            if model.data(index, CuelistModel.ExpandedRole):
+                self.setExpanded(index, True)
+
+            if model.hasChildren(index):
+                self._expand(index, 0, model.rowCount(index) - 1)
 
     def dropEvent(self, event):
-        """Validate item while dropping"""
+        """Move entity of dragged item, rows are moved by model"""
 
-        dropping = self.itemAt(event.pos())
-        dragging = self.currentItem()
-        dragging_object = dragging.object()
+        model = self.model()
+        index = self.indexAt(event.pos())
+        dropping = model.entity(index)
+        dragging = model.entity(self.currentIndex())
         drop_indicator = self.dropIndicatorPosition()
 
+        event.accept()
+
+        if not dragging or not dropping:
+            return
+
+        # item can't be moved inside itself
+        while index.isValid():
+            if model.entity(index).id == dragging.id:
+                return
+
+            index = index.parent()
+
         # don't allow moving of project and project settings entities
-        if (dragging_object.type == DNA.TYPE_PROJECT and dragging_object.parent_id == 0) or \
-                (dragging_object.type == DNA.TYPE_SETTINGS and dragging_object.parent_id == 1):
+        if (dragging.type == DNA.TYPE_PROJECT and dragging.parent_id == 0) or \
+                (dragging.type == DNA.TYPE_SETTINGS and dragging.parent_id == 1):
             message = MessageDialog(title="Item can't be moved",
-                                    text="Item '%s' can't be moved" % dragging_object.name,
+                                    text="Item '%s' can't be moved" % dragging.name,
                                     icon=MessageDialog.Warning)
             message.exec_()
 
@@ -1121,15 +1486,18 @@ class TreeWidget(QtWidgets.QTreeWidget):
 
         # manage a boolean for the case when you are above an item
         if drop_indicator == QtWidgets.QAbstractItemView.AboveItem:
-            dragging.object().index = dropping.object().index - 1
+            dragging.parent_id = dropping.parent_id
+            dragging.index = dropping.index - 1
         # something when being below an item
         elif drop_indicator == QtWidgets.QAbstractItemView.BelowItem:
-            dragging.object().index = dropping.object().index + 1
+            dragging.parent_id = dropping.parent_id
+            dragging.index = dropping.index + 1
         # you're on an item, maybe add the current one as a child
         elif drop_indicator == QtWidgets.QAbstractItemView.OnItem:
-            dragging.object().parent_id = dropping.object().id
+            dragging.parent_id = dropping.id
         # you are not on your tree
         elif drop_indicator == QtWidgets.QAbstractItemView.OnViewport:
-            pass
+            return
 
-        QtWidgets.QTreeWidget.dropEvent(self, event)
+        # commit parent and position at once, model moves row
+        dragging.update()
@@ -0,0 +1,237 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.plugins.display.compositor
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Render composition once and share it between outputs
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import time
+
+from grail.qt import *
+
+
+class DisplayCompositor(QtCore.QObject):
+    """Render scene into offscreen image which is shared by all outputs and previews.
+
+    Scene is rasterised only when it was changed, so adding outputs doesn't
+    add rendering work, every output just draws the image.
+
+    Changes of scene are collected between frames, scene is rendered and outputs
+    are notified at most once per refresh interval of the fastest screen,
+    frame clock stops when nothing changes.
+
+    Frame clock also drives animations, so transitions are advanced
+    right before frame is rendered and stay in sync on every output.
+
+    Outputs which show only a part of composition register their source region,
+    only union of regions is rasterised, so tiled outputs don't render same pixels twice.
+    """
+
+    # new frame is available, outputs should be updated
+    updated = QtSignal()
+
+    # refresh rate used when screens don't report it
+    DEFAULT_REFRESH_RATE = 60
+
+    def __init__(self, scene: QtWidgets.QGraphicsScene):
+        super(DisplayCompositor, self).__init__()
+
+        self._scene = scene
+        self._frame = QtGui.QImage()
+        self._dirty = True
+        self._pending = False
+
+        self._frames = 0
+        self._dropped = 0
+        self._frame_time = 0
+        self._frame_time_max = 0
+        self._frame_time_total = 0
+        self._last_tick = 0
+        self._interval = 1 / self.DEFAULT_REFRESH_RATE
+
+        # running animations: target -> (start time, duration, callback)
+        self._animations = {}
+
+        # parts of composition shown by outputs: output -> QRectF or None for whole scene
+        self._regions = {}
+        self._frame_area = 0
+
+        self._timer = QtCore.QTimer()
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+        self._scene.changed.connect(self._scene_changed)
+        self._scene.sceneRectChanged.connect(self._scene_changed)
+
+    @property
+    def dirty(self) -> bool:
+        """Returns True if scene was changed after last frame was rendered"""
+
+        return self._dirty or self._frame.isNull()
+
+    def frame(self) -> QtGui.QImage:
+        """Returns latest image of composition, changes of scene appear on next frame"""
+
+        if self._frame.isNull():
+            self.render()
+
+        return self._frame
+
+    def render(self):
+        """Render scene to frame"""
+
+        started = time.perf_counter()
+        width, height = max(1, int(self._scene.width())), max(1, int(self._scene.height()))
+
+        if self._frame.width() != width or self._frame.height() != height:
+            self._frame = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied)
+
+        painter = QtGui.QPainter()
+        painter.begin(self._frame)
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+
+        self._frame_area = 0
+
+        for rect in self._area(width, height):
+            self._frame_area += rect.width() * rect.height()
+
+            painter.setClipRect(rect)
+            painter.fillRect(rect, QtCore.Qt.black)
+
+            self._scene.render(painter, QtCore.QRectF(rect), QtCore.QRectF(rect), QtCore.Qt.IgnoreAspectRatio)
+
+        painter.end()
+
+        self._dirty = False
+        self._frames += 1
+        self._frame_time = time.perf_counter() - started
+        self._frame_time_total += self._frame_time
+        self._frame_time_max = max(self._frame_time_max, self._frame_time)
+
+    def invalidate(self):
+        """Mark frame as outdated, outputs will be updated on next frame"""
+
+        self._dirty = True
+        self._pending = True
+
+        if not self._timer.isActive():
+            self._interval = 1 / self.refresh_rate()
+            self._last_tick = time.perf_counter()
+            self._timer.start(max(1, int(self._interval * 1000)))
+
+    def set_region(self, output, rect: QtCore.QRectF = None):
+        """Set part of composition shown by output
+
+        Args:
+            output: object which draws frame
+            rect (QRectF): region of scene, None if output shows whole scene
+        """
+
+        self._regions[output] = QtCore.QRectF(rect) if rect else None
+        self.invalidate()
+
+    def remove_region(self, output):
+        """Output doesn't show composition anymore"""
+
+        self._regions.pop(output, None)
+
+    def animate(self, target, duration: float, fn):
+        """Run animation on frame clock, replaces running animation of the same target
+
+        Args:
+            target: object which is animated
+            duration (float): duration in seconds, if zero animation finishes immediately
+            fn (callable): function which receives progress of animation from 0 to 1
+        """
+
+        if duration <= 0:
+            self._animations.pop(target, None)
+            fn(1.0)
+
+            return
+
+        self._animations[target] = (time.perf_counter(), duration, fn)
+
+        fn(0.0)
+        self.invalidate()
+
+    def refresh_rate(self) -> float:
+        """Returns refresh rate of the fastest screen"""
+
+        rates = [screen.refreshRate() for screen in QtGui.QGuiApplication.screens()]
+
+        return max(rates + [0]) or self.DEFAULT_REFRESH_RATE
+
+    def statistics(self) -> dict:
+        """Returns dict with number of rendered and dropped frames, rendered pixels and render time in milliseconds"""
+
+        return {'frames': self._frames,
+                'dropped': self._dropped,
+                'refresh_rate': 1 / self._interval,
+                'frame_area': self._frame_area,
+                'frame_time': self._frame_time * 1000,
+                'frame_time_max': self._frame_time_max * 1000,
+                'frame_time_mean': self._frame_time_total / self._frames * 1000 if self._frames else 0}
+
+    def _tick(self):
+        """Frame clock"""
+
+        now = time.perf_counter()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+
+        # frame clock was late for more than a half of interval
+        if elapsed > self._interval * 1.5:
+            self._dropped += int(elapsed / self._interval + 0.5) - 1
+
+        if self._animations:
+            self._advance(now)
+
+        if not self._pending:
+            self._timer.stop()
+
+            return
+
+        self._pending = False
+
+        if self._dirty:
+            self.render()
+
+        self.updated.emit()
+
+    def _area(self, width, height):
+        """Returns list of rectangles of frame which should be rendered"""
+
+        full = QtCore.QRect(0, 0, width, height)
+        regions = list(self._regions.values())
+
+        if not regions or None in regions:
+            return [full]
+
+        area = QtGui.QRegion()
+
+        for rect in regions:
+            area = area.united(QtGui.QRegion(rect.toAlignedRect().intersected(full)))
+
+        return area.rects()
+
+    def _advance(self, now):
+        """Advance animations to current frame"""
+
+        for target, (start, duration, fn) in list(self._animations.items()):
+            progress = min(1.0, (now - start) / duration)
+
+            if progress >= 1.0:
+                del self._animations[target]
+
+            fn(progress)
+
+        self._dirty = True
+        self._pending = True
+
+    def _scene_changed(self, *args):
+
+        self.invalidate()
@@ -8,6 +8,8 @@
     :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
     :license: GNU, see LICENSE for more details.
 """
+import functools
+
 from grail.qt import *
 from grail.core import Plugin
 
@@ -32,10 +34,24 @@ class DisplayPlugin(Plugin):
 
     _instance = None
 
+    # delay in milliseconds before changed composition state is written to project
+    FLUSH_INTERVAL = 250
+
+    # number of media layers, can be changed with `display/layers` setting
+    DEFAULT_LAYERS = 8
+
     def __init__(self):
         super(DisplayPlugin, self).__init__()
 
-        self.MAX_LAYERS = 2
+        self.MAX_LAYERS = max(1, int(self.app.settings.get('display/layers', default=self.DEFAULT_LAYERS)))
+
+        # Composition state, changed keys are written to project in batches
+        self._state = {}
+        self._dirty = set()
+        self._flush_timer = QtCore.QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush_state)
 
         # Register instance
         if not DisplayPlugin._instance:
@@ -86,24 +102,23 @@ class DisplayPlugin(Plugin):
         self._connect_signal_proxy('/clip/text/shadow', self._text_shadow_cb)
         self._connect_signal_proxy('/clip/text/transform', self._text_transform_cb)
 
-        def connect_layer(layer):
-            self._connect_signal_proxy(f"/clip/{layer}/size", lambda w, h: self._clip_size_cb(layer, w, h))
-            self._connect_signal_proxy(f"/clip/{layer}/pos", lambda x, y: self._clip_pos_cb(layer, x, y))
-            self._connect_signal_proxy(f"/clip/{layer}/rotate", lambda angle: self._clip_angle_cb(layer, angle))
-            self._connect_signal_proxy(f"/clip/{layer}/opacity", lambda opacity: self._clip_opacity_cb(layer, opacity))
-            self._connect_signal_proxy(f"/clip/{layer}/volume", lambda volume: self._clip_volume_cb(layer, volume))
-            self._connect_signal_proxy(f"/clip/{layer}/scale", lambda scale: self._clip_scale_cb(layer, scale))
+        # Media clip signals, `/clip/*/opacity` patterns reach every layer
+        for layer in range(1, self.MAX_LAYERS + 1):
+            self._connect_signal_proxy(f"/clip/{layer}/size", functools.partial(self._clip_size_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/pos", functools.partial(self._clip_pos_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/rotate", functools.partial(self._clip_angle_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/opacity", functools.partial(self._clip_opacity_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/volume", functools.partial(self._clip_volume_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/scale", functools.partial(self._clip_scale_cb, layer))
             self._connect_signal_proxy(f"/clip/{layer}/playback/source",
-                                       lambda source: self._clip_source_cb(layer, source))
+                                       functools.partial(self._clip_source_cb, layer))
             self._connect_signal_proxy(f"/clip/{layer}/playback/position",
-                                       lambda pos: self._clip_position_cb(layer, pos))
+                                       functools.partial(self._clip_position_cb, layer))
             self._connect_signal_proxy(f"/clip/{layer}/playback/transport",
-                                       lambda tr: self._clip_transport_cb(layer, tr))
-            self._connect_signal_proxy(f"/clip/{layer}/playback/play", lambda: self._clip_play_cb(layer))
-
-        # Media clip signals
-        for layer_id in range(1, self.MAX_LAYERS + 1):
-            connect_layer(layer_id)
+                                       functools.partial(self._clip_transport_cb, layer))
+            self._connect_signal_proxy(f"/clip/{layer}/playback/play", functools.partial(self._clip_play_cb, layer))
+            self.connect_signal(f"/clip/{layer}/playback/pause", functools.partial(self._clip_pause_cb, layer))
+            self.connect_signal(f"/clip/{layer}/playback/stop", functools.partial(self._clip_stop_cb, layer))
 
         desktop = QtWidgets.QApplication.desktop()
         desktop.resized.connect(self._screens_changed)
@@ -111,6 +126,7 @@ class DisplayPlugin(Plugin):
         desktop.workAreaResized.connect(self._screens_changed)
 
         self._scene = DisplayScene()
+        self._scene.set_max_layers(self.MAX_LAYERS)
         self._scene.set_size(1920, 1080)
         self._outputs = []
         self._preferences_dialog = DisplayPreferencesDialog(self)
@@ -149,19 +165,46 @@ class DisplayPlugin(Plugin):
         def proxy(*args):
             fn(*args)
 
-            self._comp_entity.set(message, list(args))
+            self._store_state(message, list(args))
+
+        self.connect_signal(message, proxy)
+
+    def _store_state(self, message, value):
+        """Remember state and schedule write to project"""
+
+        if self._state.get(message) == value:
+            return
+
+        self._state[message] = value
+        self._dirty.add(message)
 
-        self.connect_signal(message, lambda *args: proxy(*args))
+        # don't restart timer, so continuous changes are still written periodically
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
 
     def _recall_state(self, message, default=None):
 
         value = self._comp_entity.get(message, default=default)
 
         if value is not None:
+            self._state[message] = list(value)
             self.emit_signal(message, *value)
 
+    def flush_state(self):
+        """Write changed composition state to project"""
+
+        self._flush_timer.stop()
+
+        dirty = self._dirty
+        self._dirty = set()
+
+        for message in dirty:
+            self._comp_entity.set(message, self._state[message])
+
     def cue_cb(self, cue):
 
+        self.flush_state()
+
         if hasattr(cue, 'text') and cue.text:
            self.scene.set_text(cue.text)
 
@@ -205,6 +248,14 @@ class DisplayPlugin(Plugin):
 
         self._scene.clip_playback_play(layer)
 
+    def _clip_pause_cb(self, layer):
+
+        self._scene.clip_playback_pause(layer)
+
+    def _clip_stop_cb(self, layer):
+
+        self._scene.clip_playback_stop(layer)
+
     def _clip_size_cb(self, layer, width, height):
 
         self._scene.clip_size(layer, width, height)
@@ -291,7 +342,7 @@ class DisplayPlugin(Plugin):
     def clear_output_action(self, action=None):
         """Clear display output"""
 
-        for layer in range(1, self.MAX_LAYERS):
+        for layer in range(1, self.MAX_LAYERS + 1):
             self.emit_signal(f"/clip/{layer}/playback/stop")
 
     def clear_text_action(self, action=None):
@@ -302,6 +353,7 @@ class DisplayPlugin(Plugin):
     def close(self):
         """Close display and friends on application exit"""
 
+        self.flush_state()
         self._preferences_dialog.close()
 
         for output in self._outputs:
@@ -0,0 +1,389 @@
+# -*- coding: UTF-8 -*-
+"""
+    grail.plugins.display.headless
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Render composition without windows and export raw frames
+
+    Frames are rendered by compositor at fixed frame rate and written as raw
+    BGRA pixels (QImage.Format_ARGB32_Premultiplied on little-endian machines)
+    to a file, to stdin of another process or to shared memory ring buffer.
+
+    Usage:
+        python -m grail.plugins.display.headless --size 1920x1080 --fps 30 --frames 300 --output frames.raw
+        python -m grail.plugins.display.headless --text Hello --output - | \
+            ffmpeg -f rawvideo -pix_fmt bgra -s 1920x1080 -r 30 -i - output.mp4
+
+    Shared memory layout:
+        header: magic `GRLF`, version, width, height, bytes per line, number of slots (uint32 each)
+                and number of written frames (uint64), little-endian, 32 bytes
+        slots: frame number (uint64), time of frame (double) and pixels of frame
+
+    :copyright: (c) 2016-2020 by Oleksii Lytvyn (http://alexlitvin.name)
+    :license: GNU, see LICENSE for more details.
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import signal
+import struct
+import logging
+import argparse
+import subprocess
+import collections
+
+from multiprocessing import shared_memory
+
+from grail.qt import *
+from grail.core import Dispatcher
+
+from .scene import DisplayScene
+
+__all__ = ['FileSink', 'PipeSink', 'SharedMemorySink', 'HeadlessRenderer']
+
+
+class FileSink:
+    """Write raw frames to file or stream"""
+
+    def __init__(self, path: str):
+        """Open file, `-` means standard output"""
+
+        if path == '-':
+            self._file = sys.stdout.buffer
+            self._owner = False
+        else:
+            self._file = open(path, 'wb')
+            self._owner = True
+
+    def write(self, frame: QtGui.QImage, index: int, timestamp: float):
+        """Write pixels of frame"""
+
+        self._file.write(_pixels(frame))
+
+    def close(self):
+        """Flush and close file"""
+
+        self._file.flush()
+
+        if self._owner:
+            self._file.close()
+
+
+class PipeSink(FileSink):
+    """Write raw frames to standard input of process, for example video encoder"""
+
+    def __init__(self, command: str):
+        """Start process
+
+        Args:
+            command (str): command line of process
+        """
+
+        self._process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+        self._file = self._process.stdin
+        self._owner = True
+
+    def close(self):
+        """Close pipe and wait until process exits"""
+
+        try:
+            super(PipeSink, self).close()
+        except OSError:
+            pass
+
+        self._process.wait()
+
+
+class SharedMemorySink:
+    """Write raw frames to ring buffer in shared memory, readers pick latest slot"""
+
+    MAGIC = b'GRLF'
+    VERSION = 1
+
+    _HEADER = struct.Struct('<4sIIIIIQ')
+    _SLOT = struct.Struct('<Qd')
+
+    def __init__(self, name: str, width: int, height: int, slots: int = 4):
+        """Create shared memory block
+
+        Args:
+            name (str): name of shared memory block
+            width (int): width of frames
+            height (int): height of frames
+            slots (int): number of frames in ring
+        """
+
+        self._width = width
+        self._height = height
+        self._stride = width * 4
+        self._slots = max(2, slots)
+        self._slot_size = self._SLOT.size + self._stride * height
+        self._written = 0
+
+        self._memory = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=self._HEADER.size + self._slot_size * self._slots)
+        self._write_header()
+
+    @property
+    def name(self):
+        """Returns name of shared memory block"""
+
+        return self._memory.name
+
+    def write(self, frame: QtGui.QImage, index: int, timestamp: float):
+        """Write frame to next slot, counter is updated after pixels"""
+
+        if frame.width() != self._width or frame.height() != self._height:
+            raise ValueError("Frame size doesn't match size of shared memory buffer")
+
+        offset = self._HEADER.size + self._slot_size * (self._written % self._slots)
+        start = offset + self._SLOT.size
+
+        self._memory.buf[start:start + self._stride * self._height] = _pixels(frame)
+        self._SLOT.pack_into(self._memory.buf, offset, index, timestamp)
+
+        self._written += 1
+        self._write_header()
+
+    def close(self):
+        """Release shared memory block"""
+
+        self._memory.close()
+        self._memory.unlink()
+
+    def _write_header(self):
+
+        self._HEADER.pack_into(self._memory.buf, 0, self.MAGIC, self.VERSION, self._width, self._height,
+                               self._stride, self._slots, self._written)
+
+
+def _pixels(frame: QtGui.QImage):
+    """Returns buffer with pixels of frame without copying"""
+
+    bits = frame.constBits()
+    bits.setsize(frame.sizeInBytes())
+
+    return memoryview(bits)
+
+
+class HeadlessRenderer(QtCore.QObject):
+    """Render scene at fixed frame rate and pass frames to sink
+
+    Frame is taken from scene compositor, so scene is rendered only when it changes,
+    unless `redraw` is set, then every frame is rendered which is useful for benchmarks.
+    """
+
+    # number of frames limit was reached
+    finished = QtSignal()
+
+    # number of frames to keep timings of
+    TIMINGS_LIMIT = 10000
+
+    def __init__(self, scene: DisplayScene, sink=None, fps: float = 30, redraw: bool = False):
+        """Create renderer
+
+        Args:
+            scene (DisplayScene): scene to render
+            sink: object with `write(frame, index, timestamp)` and `close()` methods or None
+            fps (float): frames per second
+            redraw (bool): render scene for every frame even if it wasn't changed
+        """
+        super(HeadlessRenderer, self).__init__()
+
+        self._scene = scene
+        self._sink = sink
+        self._fps = max(0.1, fps)
+        self._redraw = redraw
+        self._limit = 0
+        self._index = 0
+        self._started = 0
+        self._late = 0
+        self._timings = collections.deque(maxlen=self.TIMINGS_LIMIT)
+
+        self._timer = QtCore.QTimer()
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self, frames: int = 0):
+        """Start rendering
+
+        Args:
+            frames (int): number of frames to render, 0 to render until stopped
+        """
+
+        self._limit = frames
+        self._index = 0
+        self._late = 0
+        self._started = time.perf_counter()
+        self._timings.clear()
+
+        self._scene.compositor.set_region(self)
+        self._timer.start(0)
+
+    def stop(self):
+        """Stop rendering and close sink"""
+
+        self._timer.stop()
+        self._scene.compositor.remove_region(self)
+
+        if self._sink:
+            self._sink.close()
+            self._sink = None
+
+    def render_frame(self):
+        """Render frame and write it to sink
+
+        Returns:
+            tuple of render and write time in seconds
+        """
+
+        compositor = self._scene.compositor
+        started = time.perf_counter()
+
+        if self._redraw or compositor.dirty:
+            compositor.render()
+
+        frame = compositor.frame()
+        rendered = time.perf_counter()
+
+        if self._sink:
+            self._sink.write(frame, self._index, started - self._started)
+
+        written = time.perf_counter()
+
+        self._index += 1
+        self._timings.append((rendered - started, written - rendered))
+
+        return rendered - started, written - rendered
+
+    def statistics(self) -> dict:
+        """Returns number of frames and percentiles of render and write time in milliseconds"""
+
+        render = sorted(timing[0] for timing in self._timings)
+        write = sorted(timing[1] for timing in self._timings)
+
+        return {'frames': self._index,
+                'fps': self._fps,
+                'late': self._late,
+                'render_time': _percentiles(render),
+                'write_time': _percentiles(write)}
+
+    def _tick(self):
+        """Frame clock, frames are scheduled from start time so clock doesn't drift"""
+
+        try:
+            self.render_frame()
+        except (OSError, ValueError) as error:
+            logging.warning("Headless renderer unable to write frame: %s" % error)
+
+            self.stop()
+            self.finished.emit()
+
+            return
+
+        if self._limit and self._index >= self._limit:
+            self.stop()
+            self.finished.emit()
+
+            return
+
+        delay = self._started + self._index / self._fps - time.perf_counter()
+
+        if delay < 0:
+            self._late += 1
+
+        self._timer.start(max(0, int(delay * 1000)))
+
+
+def _percentiles(values, points=(50, 95, 99)):
+    """Returns dict of percentiles and maximum of sorted values in milliseconds"""
+
+    if not values:
+        return {}
+
+    result = {'p%d' % point: values[min(len(values) - 1, int(len(values) * point / 100))] * 1000
+              for point in points}
+    result['max'] = values[-1] * 1000
+
+    return result
+
+
+class HeadlessApplication(QtWidgets.QApplication):
+    """Application without project, provides signals used by scene"""
+
+    def __init__(self, argv):
+        super(HeadlessApplication, self).__init__(argv)
+
+        self._signals = Dispatcher()
+
+    @property
+    def signals(self):
+        """Returns signals"""
+
+        return self._signals
+
+
+def main():
+    """Render composition from command line"""
+
+    parser = argparse.ArgumentParser(description="Grail headless display renderer")
+    parser.add_argument('--size', default='1920x1080', help="size of composition, WIDTHxHEIGHT")
+    parser.add_argument('--fps', type=float, default=30, help="frames per second")
+    parser.add_argument('--frames', type=int, default=0, help="number of frames, 0 to run until interrupted")
+    parser.add_argument('--text', default='', help="text shown in composition")
+    parser.add_argument('--testcard', action='store_true', help="show test card")
+    parser.add_argument('--redraw', action='store_true', help="render every frame even if nothing changed")
+    parser.add_argument('--output', default='', help="write raw frames to file, `-` for standard output")
+    parser.add_argument('--pipe', default='', help="write raw frames to standard input of command")
+    parser.add_argument('--shm', default='', help="write raw frames to shared memory ring buffer with name")
+    parser.add_argument('--slots', type=int, default=4, help="number of frames in shared memory ring buffer")
+    parser.add_argument('--json', default='', help="write timings to file")
+    args = parser.parse_args()
+
+    try:
+        width, height = (int(value) for value in args.size.lower().split('x'))
+    except ValueError:
+        parser.error("size should be given as WIDTHxHEIGHT")
+
+    # don't require display server
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    app = HeadlessApplication(sys.argv[:1])
+
+    scene = DisplayScene()
+    scene.set_size(width, height)
+    scene.set_testcard(args.testcard)
+    scene.set_text(args.text)
+
+    if args.output:
+        sink = FileSink(args.output)
+    elif args.pipe:
+        sink = PipeSink(args.pipe)
+    elif args.shm:
+        sink = SharedMemorySink(args.shm, width, height, args.slots)
+    else:
+        sink = None
+
+    renderer = HeadlessRenderer(scene, sink, fps=args.fps, redraw=args.redraw)
+    renderer.finished.connect(app.quit)
+    renderer.start(args.frames)
+
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+
+    app.exec_()
+    renderer.stop()
+
+    # standard output may be used by frames
+    report = json.dumps(renderer.statistics(), indent=4)
+    sys.stderr.write(report + '\n')
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            file.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -537,6 +537,82 @@ class PaddingPopup(QPopup):
         self._padding = [padding_left, padding_top, padding_right, padding_bottom]
 
 
+class RegionPopup(QPopup):
+    """Source region of output popup dialog"""
+
+    updated = QtSignal(int, int, int, int)
+
+    def __init__(self, x=0, y=0, width=0, height=0, parent=None):
+        super(RegionPopup, self).__init__(parent)
+
+        self._region = [x, y, width, height]
+
+        self.__ui__()
+
+    def __ui__(self):
+        self.ui_x = QtWidgets.QSpinBox()
+        self.ui_x.setRange(0, 16384)
+        self.ui_x.valueChanged.connect(self._value_changed)
+
+        self.ui_y = QtWidgets.QSpinBox()
+        self.ui_y.setRange(0, 16384)
+        self.ui_y.valueChanged.connect(self._value_changed)
+
+        self.ui_width = QtWidgets.QSpinBox()
+        self.ui_width.setRange(0, 16384)
+        self.ui_width.valueChanged.connect(self._value_changed)
+
+        self.ui_height = QtWidgets.QSpinBox()
+        self.ui_height.setRange(0, 16384)
+        self.ui_height.valueChanged.connect(self._value_changed)
+
+        self.ui_layout = QtWidgets.QGridLayout()
+        self.ui_layout.setSpacing(8)
+        self.ui_layout.setContentsMargins(12, 12, 12, 12)
+
+        self.ui_layout.addWidget(QtWidgets.QLabel('X'), 0, 0)
+        self.ui_layout.addWidget(self.ui_x, 1, 0)
+
+        self.ui_layout.addWidget(QtWidgets.QLabel('Y'), 0, 1)
+        self.ui_layout.addWidget(self.ui_y, 1, 1)
+
+        self.ui_layout.addWidget(QtWidgets.QLabel('Width'), 2, 0)
+        self.ui_layout.addWidget(self.ui_width, 3, 0)
+
+        self.ui_layout.addWidget(QtWidgets.QLabel('Height'), 2, 1)
+        self.ui_layout.addWidget(self.ui_height, 3, 1)
+
+        self.setLayout(self.ui_layout)
+        self.setWindowTitle('Source')
+        self.setGeometry(100, 300, 240, 128)
+
+        self.setRegion(*self._region)
+
+    def _value_changed(self, i):
+        """Value spinbox has changed"""
+
+        self._region = [int(self.ui_x.value()), int(self.ui_y.value()),
+                        int(self.ui_width.value()), int(self.ui_height.value())]
+        self.updated.emit(*self._region)
+
+    def setRegion(self, x=0, y=0, width=0, height=0):
+        """Set region values, zero size means whole composition
+
+        Args:
+            x (int): left edge of region
+            y (int): top edge of region
+            width (int): width of region
+            height (int): height of region
+        """
+
+        self._region = [x, y, width, height]
+
+        for box, value in zip((self.ui_x, self.ui_y, self.ui_width, self.ui_height), self._region):
+            box.blockSignals(True)
+            box.setValue(value)
+            box.blockSignals(False)
+
+
 class AlignPopup(QPopup):
     """Text align popup dialog"""
 
@@ -870,6 +946,9 @@ class DisplayPreferencesDialog(QtWidgets.QDialog):
         self.case_popup = CasePopup(0)
         self.case_popup.updated.connect(self.case_updated)
 
+        self.region_popup = RegionPopup()
+        self.region_popup.updated.connect(self.region_updated)
+
         desktop = QtWidgets.QApplication.desktop()
         desktop.resized.connect(self._screens_changed)
         desktop.screenCountChanged.connect(self._screens_changed)
@@ -896,6 +975,9 @@ class DisplayPreferencesDialog(QtWidgets.QDialog):
         self._ui_display_dest_action.setChecked(True)
         self._ui_display_dest_action.clicked.connect(self.dest_action)
 
+        self._ui_display_source_action = QtWidgets.QPushButton("Source", self)
+        self._ui_display_source_action.clicked.connect(self.source_action)
+
         self._ui_display_output_action = QtWidgets.QPushButton("Disabled", self)
         self._ui_display_output_action.setMenu(self._ui_display_menu)
 
@@ -905,6 +987,7 @@ class DisplayPreferencesDialog(QtWidgets.QDialog):
 
         self._ui_display_toolbar = QtWidgets.QToolBar()
         self._ui_display_toolbar.addWidget(self._ui_display_dest_action)
+        self._ui_display_toolbar.addWidget(self._ui_display_source_action)
         self._ui_display_toolbar.addStretch()
         self._ui_display_toolbar.addWidget(self._ui_display_output_action)
 
@@ -1137,6 +1220,31 @@ class DisplayPreferencesDialog(QtWidgets.QDialog):
 
         self._ui_display_dest_action.setChecked(True)
 
+    def source_action(self):
+        """Show source region of selected output"""
+
+        index = self._ui_list.currentRow()
+
+        if index <= 0:
+            return
+
+        region = self._ui_list.item(index).output.region()
+
+        if region:
+            self.region_popup.setRegion(int(region.x()), int(region.y()), int(region.width()), int(region.height()))
+        else:
+            self.region_popup.setRegion(0, 0, *self._plugin.scene.size)
+
+        self.region_popup.showAt(self._map_action_position(self._ui_display_source_action))
+
+    def region_updated(self, x, y, width, height):
+        """Source region of output updated"""
+
+        index = self._ui_list.currentRow()
+
+        if index > 0:
+            self._ui_list.item(index).output.setRegion(QtCore.QRectF(x, y, width, height))
+
     def add_action(self):
         """Add output action"""
 
@@ -11,6 +11,41 @@
 from grail.qt import *
 from grail.qt import colors as qt_colors
 
+from .compositor import DisplayCompositor
+
+
+def blur_image(image, radius):
+    """Returns blurred copy of image
+
+    Blur is done once by Qt graphics effect in offscreen scene,
+    so result can be cached and composited without any effect.
+
+    Args:
+        image (QImage): source image
+        radius (float): blur radius in pixels
+    """
+
+    item = QtWidgets.QGraphicsPixmapItem(QtGui.QPixmap.fromImage(image))
+
+    effect = QtWidgets.QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    effect.setBlurHints(QtWidgets.QGraphicsBlurEffect.QualityHint)
+    item.setGraphicsEffect(effect)
+
+    scene = QtWidgets.QGraphicsScene()
+    scene.addItem(item)
+
+    rect = QtCore.QRectF(0, 0, image.width(), image.height())
+    result = QtGui.QImage(image.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+    result.fill(QtCore.Qt.transparent)
+
+    painter = QtGui.QPainter()
+    painter.begin(result)
+    scene.render(painter, rect, rect)
+    painter.end()
+
+    return result
+
 
 class TestCardTexture(QtGui.QPixmap):
 
@@ -77,6 +112,7 @@ class TestCardTexture(QtGui.QPixmap):
 
 
 class DisplaySceneLayer:
+    """Media clip of scene, media player is taken from scene only when layer has a source"""
 
     def __init__(self, scene, layer=1):
 
@@ -87,24 +123,28 @@ class DisplaySceneLayer:
         self._height = 0
         self._scale = 1.0
         self._angle = 0
+        self._volume = 1.0
+        self._opacity = 1.0
         self._layer_id = layer
+        self._source = None
+
+        # media player and video item, None while layer is idle
+        self._media = None
+
+        # last frame of previous source, shown above video during crossfade
+        self._snapshot_item = None
 
-        self._video_item = QtMultimediaWidgets.QGraphicsVideoItem()
-        self._video_item.setSize(QtCore.QSizeF(640, 480))
-        self._video_item.setAspectRatioMode(QtCore.Qt.IgnoreAspectRatio)
+    @property
+    def id(self):
+        """Returns number of layer"""
 
-        self._video_player = QtMultimedia.QMediaPlayer(None, QtMultimedia.QMediaPlayer.VideoSurface)
-        self._video_player.setVideoOutput(self._video_item)
-        self._video_player.positionChanged.connect(self._position_cb)
-        self._video_player.durationChanged.connect(self._duration_cb)
-        self._video_player.stateChanged.connect(self._state_cb)
+        return self._layer_id
 
-        self.connect(f"/clip/{self._layer_id}/playback/play", self._video_player.play)
-        self.connect(f"/clip/{self._layer_id}/playback/pause", self._video_player.pause)
-        self.connect(f"/clip/{self._layer_id}/playback/stop", self._video_player.stop)
-        self.connect(f"/clip/{self._layer_id}/playback/position", self._video_player.setPosition)
+    @property
+    def idle(self):
+        """Returns True if layer doesn't hold media player"""
 
-        self._scene.addItem(self._video_item)
+        return self._media is None
 
     def set_volume(self, value: float):
 
@@ -113,18 +153,25 @@ class DisplaySceneLayer:
         elif value <= 0:
             value = 0
 
-        self._video_player.setVolume(value * 100)
+        self._volume = value
+
+        if self._media:
+            self._media[0].setVolume(value * 100)
 
     @property
     def volume(self):
-        return self._video_player.volume() / 100
+        return self._volume
 
     def set_opacity(self, value):
-        self._video_item.setOpacity(value)
+
+        self._opacity = value
+
+        if self._media:
+            self._media[1].setOpacity(value)
 
     @property
     def opacity(self):
-        return self._video_item.opacity()
+        return self._opacity
 
     def set_size(self, width: int, height: int):
 
@@ -172,40 +219,149 @@ class DisplaySceneLayer:
 
     def set_source(self, path: str):
 
-        self._video_player.setMedia(QtMultimedia.QMediaContent(QtCore.QUrl.fromLocalFile(path)))
-        self._video_item.show()
+        if not path:
+            self.release()
+
+            return
+
+        self._source = path
+
+        player, item = self._acquire()
+        player.setMedia(QtMultimedia.QMediaContent(QtCore.QUrl.fromLocalFile(path)))
+        item.show()
 
     def play(self):
 
-        self._video_player.play()
+        # media player was released when clip stopped
+        if self._media is None:
+            if not self._source:
+                return
+
+            self.set_source(self._source)
+
+        self._media[0].play()
 
     def pause(self):
 
-        self._video_player.pause()
+        if self._media:
+            self._media[0].pause()
 
     def stop(self):
 
-        self._video_player.stop()
+        if self._media:
+            self._media[0].stop()
+
+        self.release()
 
-    def set_playback_position(self, position: float): pass
+    def release(self):
+        """Return media player to scene, layer keeps its properties"""
+
+        if self._media is None:
+            return
+
+        player, item = self._media
+        self._media = None
+
+        player.positionChanged.disconnect(self._position_cb)
+        player.durationChanged.disconnect(self._duration_cb)
+        player.stateChanged.disconnect(self._state_cb)
+
+        self.set_fade(1)
+        self._scene.release_media(player, item)
+
+    def set_playback_position(self, position: float):
+
+        if self._media:
+            self._media[0].setPosition(int(position))
 
     def set_transport(self, value: str): pass
 
+    def snapshot(self):
+        """Keep current frame of clip as image to crossfade it with next source
+
+        Returns:
+            True if there is a frame to crossfade
+        """
+
+        if self._media is None or not self._width or not self._height:
+            return False
+
+        item = self._media[1]
+        size = item.size()
+
+        image = QtGui.QImage(int(size.width()), int(size.height()), QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+
+        painter = QtGui.QPainter()
+        painter.begin(image)
+        item.paint(painter, QtWidgets.QStyleOptionGraphicsItem(), None)
+        painter.end()
+
+        if self._snapshot_item is None:
+            self._snapshot_item = QtWidgets.QGraphicsPixmapItem(item.parentItem())
+            self._snapshot_item.setTransformationMode(QtCore.Qt.SmoothTransformation)
+            self._snapshot_item.setZValue(self._layer_id + 0.5)
+
+        self._snapshot_item.setPixmap(QtGui.QPixmap.fromImage(image))
+        self._snapshot_item.setOpacity(self._opacity)
+        self._resize()
+
+        return True
+
+    def set_fade(self, value: float):
+        """Set progress of crossfade from previous source from 0 to 1"""
+
+        if self._snapshot_item is None:
+            return
+
+        if value >= 1:
+            self._scene.removeItem(self._snapshot_item)
+            self._snapshot_item = None
+        else:
+            self._snapshot_item.setOpacity(self._opacity * (1 - value))
+
+    def _acquire(self):
+        """Returns media player and video item, takes them from scene if layer is idle"""
+
+        if self._media is None:
+            player, item = self._scene.acquire_media()
+
+            player.positionChanged.connect(self._position_cb)
+            player.durationChanged.connect(self._duration_cb)
+            player.stateChanged.connect(self._state_cb)
+            player.setVolume(self._volume * 100)
+
+            item.setZValue(self._layer_id)
+            item.setOpacity(self._opacity)
+
+            self._media = (player, item)
+            self._resize()
+
+        return self._media
+
     def _resize(self):
 
+        if self._media is None:
+            return
+
+        item = self._media[1]
         sw, sh = self._scene.width(), self._scene.height()
         w, h = self._width, self._height
         tx, ty = w / 2, h / 2
 
-        self._video_item.setPos(sw / 2 - w / 2 + self._x, sh / 2 - h / 2 + self._y)
-        self._video_item.setSize(QtCore.QSizeF(w, h))
+        item.setPos(sw / 2 - w / 2 + self._x, sh / 2 - h / 2 + self._y)
+        item.setSize(QtCore.QSizeF(w, h))
 
         t = QtGui.QTransform()
         t.translate(tx, ty)
         t.rotate(self._angle)
         t.scale(self._scale, self._scale)
         t.translate(-tx, -ty)
-        self._video_item.setTransform(t)
+        item.setTransform(t)
+
+        if self._snapshot_item:
+            self._snapshot_item.setPos(item.pos())
+            self._snapshot_item.setTransform(t)
 
     def _position_cb(self, position):
 
@@ -224,11 +380,6 @@ class DisplaySceneLayer:
 
         Application.instance().signals.emit(message, *args)
 
-    def connect(self, message, fn):
-        """Connect event handler"""
-
-        Application.instance().signals.connect(message, fn)
-
 
 class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
 
@@ -246,9 +397,33 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
         self._shadow_color = QtGui.QColor("#000")
         self._shadow_position = QtCore.QPointF(0, 0)
 
-    def set_text(self, text):
+        # text and shadow rendered to image, re-rendered only when key changes
+        self._cache_key = None
+        self._cache_image = QtGui.QImage()
+
+        # blurred shadow is cached separately, it is the most expensive part
+        self._shadow_key = None
+        self._shadow_image = QtGui.QImage()
+        self._shadow_offset = QtCore.QPointF(0, 0)
+
+        # outgoing text during crossfade
+        self._fade = 1.0
+        self._fade_image = QtGui.QImage()
+
+    def set_text(self, text, fade=False):
+        """Change text
+
+        Args:
+            text (str): new text
+            fade (bool): keep image of current text to crossfade it with new one
+        """
+
+        if fade:
+            self._fade_image = self._cache_image
+            self._fade = 0.0
 
         self._text = text
+        self.update()
 
     def text(self):
 
@@ -257,6 +432,7 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
     def set_font(self, font):
 
         self._font = font
+        self.update()
 
     def font(self):
 
@@ -265,6 +441,7 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
     def set_color(self, color):
 
         self._color = color
+        self.update()
 
     def color(self):
 
@@ -273,6 +450,7 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
     def set_alignment(self, alignment):
 
         self._alignment = alignment
+        self.update()
 
     def alignment(self):
 
@@ -281,10 +459,12 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
     def set_padding(self, l, t, r, b):
 
         self._padding = QtCore.QMarginsF(l, t, r, b)
+        self.update()
 
     def set_size(self, size_pt):
 
         self._font.setPointSizeF(size_pt)
+        self.update()
 
     def size(self):
 
@@ -293,6 +473,7 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
     def set_transform(self, transform: str):
 
         self._transform = transform
+        self.update()
 
     def boundingRect(self):
 
@@ -310,6 +491,8 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
         self._shadow_position = QtCore.QPointF(x, y)
         self._shadow_color = QtGui.QColor(color)
 
+        self.update()
+
     def shadow_blur(self):
 
         return self._shadow_blur
@@ -322,9 +505,44 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
 
         return self._shadow_position.x(), self._shadow_position.y()
 
+    def set_fade(self, value: float):
+        """Set progress of crossfade from 0 to 1"""
+
+        self._fade = value
+
+        if value >= 1:
+            self._fade_image = QtGui.QImage()
+
+        self.update()
+
     def paint(self, painter, option, widget=None):
 
-        painter.setFont(self._font)
+        p = self._padding
+        key = (self._text, self._font.key(), self._rect.width(), self._rect.height(),
+               p.left(), p.top(), p.right(), p.bottom(), int(self._alignment), self._transform,
+               self._color.rgba(), self._shadow_color.rgba(), self._shadow_position.x(), self._shadow_position.y(),
+               self._shadow_blur)
+
+        if key != self._cache_key:
+            self._cache_image = self._render()
+            self._cache_key = key
+
+        if self._fade >= 1 or self._fade_image.isNull():
+            painter.drawImage(self._rect.topLeft(), self._cache_image)
+
+            return
+
+        # crossfade cached images, text is not laid out again
+        opacity = painter.opacity()
+
+        painter.setOpacity(opacity * (1 - self._fade))
+        painter.drawImage(self._rect.topLeft(), self._fade_image)
+        painter.setOpacity(opacity * self._fade)
+        painter.drawImage(self._rect.topLeft(), self._cache_image)
+        painter.setOpacity(opacity)
+
+    def _render(self):
+        """Returns image with text and shadow"""
 
         p = self._padding
         rect = self.boundingRect()
@@ -343,21 +561,84 @@ class DisplaySceneTextItem(QtWidgets.QGraphicsItem):
         elif self._transform == "capitalize":
             text = text.capitalize()
 
-        box = QtCore.QRect(0, 0, rect.width(), rect.height())
+        image = QtGui.QImage(max(1, int(rect.width())), max(1, int(rect.height())),
+                             QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+
+        if not text:
+            return image
+
+        box = QtCore.QRectF(0, 0, rect.width(), rect.height())
         box.adjust(p.left(), p.top(), -p.right(), -p.bottom())
 
-        box_shadow = QtCore.QRect(self._shadow_position.x(), self._shadow_position.y(), rect.width(), rect.height())
-        box_shadow.adjust(p.left(), p.top(), -p.right(), -p.bottom())
+        flags = self._alignment | QtCore.Qt.TextWordWrap
 
-        painter.setPen(self._shadow_color)
-        painter.drawText(box_shadow, self._alignment | QtCore.Qt.TextWordWrap, text)
+        painter = QtGui.QPainter()
+        painter.begin(image)
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+        painter.setFont(self._font)
+
+        if self._shadow_color.alpha() > 0:
+            shadow = self._render_shadow(text, box, painter.boundingRect(box, flags, text))
+            painter.drawImage(self._shadow_offset, shadow)
 
         painter.setPen(self._color)
-        painter.drawText(box, self._alignment | QtCore.Qt.TextWordWrap, text)
+        painter.drawText(box, flags, text)
+
+        painter.end()
+
+        return image
+
+    def _render_shadow(self, text, box, bounds):
+        """Returns blurred shadow of text, cropped to area covered by shadow
+
+        Args:
+            text (str): text with applied case transformation
+            box (QRectF): text box inside of item
+            bounds (QRectF): bounding rect of text inside of box
+        """
+
+        key = (text, self._font.key(), box.x(), box.y(), box.width(), box.height(), int(self._alignment),
+               self._shadow_color.rgba(), self._shadow_position.x(), self._shadow_position.y(), self._shadow_blur)
+
+        if key == self._shadow_key:
+            return self._shadow_image
+
+        # blur spreads shadow beyond text
+        margin = max(0, int(self._shadow_blur)) * 2 + 1
+        region = bounds.translated(self._shadow_position).adjusted(-margin, -margin, margin, margin).toAlignedRect()
+
+        image = QtGui.QImage(max(1, region.width()), max(1, region.height()),
+                             QtGui.QImage.Format_ARGB32_Premultiplied)
+        image.fill(QtCore.Qt.transparent)
+
+        painter = QtGui.QPainter()
+        painter.begin(image)
+        painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+        painter.setFont(self._font)
+        painter.setPen(self._shadow_color)
+        painter.translate(-region.x(), -region.y())
+        painter.drawText(box.translated(self._shadow_position), self._alignment | QtCore.Qt.TextWordWrap, text)
+        painter.end()
+
+        if self._shadow_blur > 0:
+            image = blur_image(image, self._shadow_blur)
+
+        self._shadow_key = key
+        self._shadow_image = image
+        self._shadow_offset = QtCore.QPointF(region.x(), region.y())
+
+        return image
 
 
 class DisplayScene(QtWidgets.QGraphicsScene):
 
+    # default limit of media layers
+    MAX_LAYERS = 16
+
+    # number of released media players kept for reuse
+    POOL_SIZE = 2
+
     def __init__(self):
         super(DisplayScene, self).__init__()
 
@@ -377,15 +658,29 @@ class DisplayScene(QtWidgets.QGraphicsScene):
         self._background_item.setBrush(QtGui.QBrush(QtGui.QColor("#000")))
         self._background_item.setRect(QtCore.QRectF(0, 0, self.width(), self.height()))
 
+        # Media layers are created on demand, players of idle layers are pooled
+        self._layers = {}
+        self._max_layers = self.MAX_LAYERS
+        self._pool = []
+        self._layers_item = QtWidgets.QGraphicsItemGroup()
+
         self.addItem(self._background_item)
-        self._layers = [DisplaySceneLayer(self, layer=1), DisplaySceneLayer(self, layer=2)]
+        self.addItem(self._layers_item)
         self.addItem(self._text_item)
         self.addItem(self._testcard_item)
 
         self.set_testcard(False)
 
+        self._compositor = DisplayCompositor(self)
+
     # Global Controls
 
+    @property
+    def compositor(self):
+        """Returns compositor which renders this scene for outputs"""
+
+        return self._compositor
+
     def set_volume(self, value: float):
         """Adjust global volume"""
 
@@ -461,21 +756,74 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
         return self._transition
 
-    def layer(self, layer: int):
+    def set_max_layers(self, value: int):
+        """Limit number of media layers, layers above limit are removed"""
+
+        self._max_layers = max(1, int(value))
+
+        for layer in [layer for layer in self._layers if layer > self._max_layers]:
+            self._layers.pop(layer).release()
+
+    @property
+    def max_layers(self):
+
+        return self._max_layers
+
+    @property
+    def layers(self):
+        """Returns list of created layers"""
+
+        return [self._layers[layer] for layer in sorted(self._layers)]
+
+    def layer(self, layer: int, create: bool = False):
+        """Returns layer or None
+
+        Args:
+            layer (int): number of layer, starting from 1
+            create (bool): create layer if it doesn't exist yet
+        """
+
+        item = self._layers.get(layer)
 
-        layer = layer - 1
+        if item is None and create and 1 <= layer <= self._max_layers:
+            item = DisplaySceneLayer(self, layer=layer)
+            self._layers[layer] = item
 
-        if 0 <= layer < len(self._layers):
-            return self._layers[layer]
+        return item
 
-        return None
+    def acquire_media(self):
+        """Returns media player and video item for layer, reuses released ones"""
+
+        if self._pool:
+            return self._pool.pop()
+
+        item = QtMultimediaWidgets.QGraphicsVideoItem(self._layers_item)
+        item.setAspectRatioMode(QtCore.Qt.IgnoreAspectRatio)
+
+        player = QtMultimedia.QMediaPlayer(None, QtMultimedia.QMediaPlayer.VideoSurface)
+        player.setVideoOutput(item)
+
+        return player, item
+
+    def release_media(self, player, item):
+        """Take back media player of idle layer, media is unloaded to free decoder"""
+
+        player.stop()
+        player.setMedia(QtMultimedia.QMediaContent())
+        item.hide()
+
+        if len(self._pool) < self.POOL_SIZE:
+            self._pool.append((player, item))
+        else:
+            self.removeItem(item)
+            player.deleteLater()
 
     # Text Controls
 
     def set_text(self, text: str):
 
-        self._text_item.set_text(text)
-        self.update()
+        self._text_item.set_text(text, fade=self._transition > 0)
+        self._compositor.animate(self._text_item, self._transition, self._text_item.set_fade)
 
     def set_text_color(self, color: str):
 
@@ -562,7 +910,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
     # Layers Controls
 
     def clip_volume(self, layer: int, value: float):
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -571,7 +919,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_size(self, layer: int, width: int, height: int):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -580,7 +928,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_position(self, layer: int, x: float, y: float):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -589,7 +937,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_rotate(self, layer: int, angle: float):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -598,7 +946,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_opacity(self, layer: int, opacity: float):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -607,7 +955,7 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_scale(self, layer: int, scale: float):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
@@ -616,12 +964,15 @@ class DisplayScene(QtWidgets.QGraphicsScene):
 
     def clip_playback_source(self, layer: int, path: str):
 
-        item = self.layer(layer)
+        item = self.layer(layer, create=True)
 
         if item is None:
             return False
 
+        fade = self._transition > 0 and item.snapshot()
+
         item.set_source(path)
+        self._compositor.animate(item, self._transition if fade else 0, item.set_fade)
 
     def clip_playback_play(self, layer: int):
 
@@ -682,31 +1033,43 @@ class DisplayWindow(QtWidgets.QDialog):
         self._transformation = QtGui.QTransform()
         self._transformation_points = None
 
-        self._scene.changed.connect(lambda _: self.repaint())
-        self._scene.sceneRectChanged.connect(lambda rect: self.repaint())
+        # part of composition shown by this output, None for whole scene
+        self._region = None
+
+        # frame is drawn by OpenGL when it's available
+        if DisplayGLSurface.available():
+            self._surface = DisplayGLSurface(self)
+        else:
+            self._surface = DisplayRasterSurface(self)
+
+        self._layout = QtWidgets.QVBoxLayout()
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.addWidget(self._surface)
+
+        self.setLayout(self._layout)
+
+        self._scene.compositor.updated.connect(self._surface.update)
 
         self.setGeometry(0, 0, 800, 600)
         self.setWindowTitle("Display Output")
         self.setFrameless(False)
 
-    def paintEvent(self, event):
+    def paint(self, painter: QtGui.QPainter, rect: QtCore.QRect):
+        """Draw frame of composition with transformation of this output"""
 
-        painter = QtGui.QPainter()
-        painter.begin(self)
         painter.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
 
         # draw background
-        painter.fillRect(event.rect(), QtCore.Qt.black)
+        painter.fillRect(rect, QtCore.Qt.black)
 
         target = QtCore.QRectF(0, 0, self.width(), self.height())
-        source = QtCore.QRectF(0, 0, self._scene.width(), self._scene.height())
+        source = self._region or QtCore.QRectF(0, 0, self._scene.width(), self._scene.height())
 
         painter.setTransform(self._transformation)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
 
-        # draw scene items
-        self._scene.render(painter, target, source, QtCore.Qt.IgnoreAspectRatio)
-
-        painter.end()
+        # draw composition rendered once for all outputs
+        painter.drawImage(target, self._scene.compositor.frame(), source)
 
     def setGeometry(self, x, y, width, height):
 
@@ -717,15 +1080,39 @@ class DisplayWindow(QtWidgets.QDialog):
 
         self.setTransform(self._transformation)
 
+    def showEvent(self, event):
+
+        self._scene.compositor.set_region(self, self._region)
+
     def hideEvent(self, event):
 
+        self._scene.compositor.remove_region(self)
+
         event.ignore()
 
+    def setRegion(self, rect: QtCore.QRectF = None):
+        """Show only part of composition, for example slice of wide composition on one of projectors
+
+        Args:
+            rect (QRectF): region of scene, None to show whole scene
+        """
+
+        self._region = QtCore.QRectF(rect) if rect and not rect.isEmpty() else None
+
+        if self.isVisible():
+            self._scene.compositor.set_region(self, self._region)
+
+        self._surface.update()
+
+    def region(self):
+
+        return self._region
+
     def setTransform(self, transform: QtGui.QTransform):
 
         self._transformation = transform
 
-        self.repaint()
+        self._surface.update()
 
     def setFrameless(self, flag: bool = True):
 
@@ -756,6 +1143,74 @@ class DisplayWindow(QtWidgets.QDialog):
         return self._transformation_points
 
 
+class DisplayGLSurface(QtWidgets.QOpenGLWidget):
+    """Output surface drawn with OpenGL, frame is uploaded as texture and transformed on GPU"""
+
+    _available = None
+
+    def __init__(self, output: DisplayWindow):
+        super(DisplayGLSurface, self).__init__(output)
+
+        self._output = output
+
+        # swap buffers on vertical blank
+        surface_format = QtGui.QSurfaceFormat()
+        surface_format.setSwapInterval(1)
+
+        self.setFormat(surface_format)
+
+    def paintGL(self):
+
+        painter = QtGui.QPainter()
+        painter.begin(self)
+
+        self._output.paint(painter, self.rect())
+
+        painter.end()
+
+    @classmethod
+    def available(cls):
+        """Returns True if OpenGL context can be created and made current
+
+        Drivers without OpenGL support can be replaced by software renderer
+        with QT_OPENGL=software on Windows or LIBGL_ALWAYS_SOFTWARE=1 with Mesa,
+        otherwise raster surface is used.
+        """
+
+        if cls._available is None:
+            context = QtGui.QOpenGLContext()
+            surface = QtGui.QOffscreenSurface()
+            surface.setFormat(context.format())
+            surface.create()
+
+            cls._available = context.create() and surface.isValid() and context.makeCurrent(surface)
+
+            if cls._available:
+                context.doneCurrent()
+
+            surface.destroy()
+
+        return cls._available
+
+
+class DisplayRasterSurface(QtWidgets.QWidget):
+    """Output surface drawn by CPU, used when OpenGL is not available"""
+
+    def __init__(self, output: DisplayWindow):
+        super(DisplayRasterSurface, self).__init__(output)
+
+        self._output = output
+
+    def paintEvent(self, event):
+
+        painter = QtGui.QPainter()
+        painter.begin(self)
+
+        self._output.paint(painter, event.rect())
+
+        painter.end()
+
+
 class DisplaySceneView(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
@@ -778,18 +1233,31 @@ class DisplaySceneView(QtWidgets.QWidget):
             return False
 
         if self._scene is not None:
-            self._scene.changed.disconnect(self._scene_changed)
-            self._scene.sceneRectChanged.disconnect(self._scene_rect_changed)
+            self._scene.compositor.updated.disconnect(self._scene_changed)
+            self._scene.compositor.remove_region(self)
 
         self._scene = scene
-        self._scene.changed.connect(self._scene_changed)
-        self._scene.sceneRectChanged.connect(self._scene_rect_changed)
+        self._scene.compositor.updated.connect(self._scene_changed)
+
+        # preview shows whole composition
+        if self.isVisible():
+            self._scene.compositor.set_region(self)
+
+    def showEvent(self, event):
+
+        if self._scene is not None:
+            self._scene.compositor.set_region(self)
+
+    def hideEvent(self, event):
+
+        if self._scene is not None:
+            self._scene.compositor.remove_region(self)
 
     def setScale(self, factor: float):
 
         self._scale = factor
         self._position = QtCore.QPoint(0, 0)
-        self.repaint()
+        self.update()
 
     def paintEvent(self, event):
 
@@ -805,8 +1273,9 @@ class DisplaySceneView(QtWidgets.QWidget):
                                self._position.y() + height / 2 - scene_height / 2, scene_width, scene_height)
         source = QtCore.QRectF(0, 0, self._scene.width(), self._scene.height())
 
-        # draw scene items
-        self._scene.render(painter, target, source, QtCore.Qt.IgnoreAspectRatio)
+        # draw composition rendered once for all outputs
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        painter.drawImage(target, self._scene.compositor.frame(), source)
 
         painter.end()
 
@@ -834,7 +1303,7 @@ class DisplaySceneView(QtWidgets.QWidget):
         if f >= y >= self.height() - sh - f:
             self._position.setY(dy)
 
-        self.repaint()
+        self.update()
 
     def mousePressEvent(self, event):
 
@@ -847,10 +1316,6 @@ class DisplaySceneView(QtWidgets.QWidget):
 
         pass
 
-    def _scene_changed(self, scene):
+    def _scene_changed(self):
 
-        self.repaint()
-
-    def _scene_rect_changed(self, rect):
-
-        self.repaint()
+        self.update()
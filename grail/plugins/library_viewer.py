@@ -508,7 +508,7 @@ class LibraryViewer(Viewer):
     def add_item_action(self, entity):
         """Add item to cuelist"""
 
-        # xxx: cue will be added to all opened cuelists
+        # cue is added to cuelist of last used cuelist viewer
         self.emit_signal('/cuelist/add', entity)
 
     def delete_item_action(self, entity):
@@ -9,7 +9,7 @@
     :license: GNU, see LICENSE for more details.
 """
 from grail.qt import *
-from grail.core import Configurator
+from grail.core import Configurator, OSCHost
 
 
 class OSCInConfigurator(Configurator):
@@ -46,7 +46,8 @@ class OSCInConfigurator(Configurator):
         for entity in self._osc_entity.childs():
             if entity.get('mode', default=None) == 'in':
                 self._osc_host.input.add(entity.get('host', default='127.0.0.1'),
-                                         entity.get('port', default=9000))
+                                         entity.get('port', default=9000),
+                                         entity.get('protocol', default=OSCHost.UDP))
 
         self.__ui__()
         self.clicked()
@@ -58,10 +59,10 @@ class OSCInConfigurator(Configurator):
         self._ui_list = QtWidgets.QTableWidget()
         self._ui_list.setObjectName("OSCInConfigurator_list")
         self._ui_list.setShowGrid(False)
-        self._ui_list.setColumnCount(2)
+        self._ui_list.setColumnCount(3)
         self._ui_list.horizontalHeader().setVisible(False)
         self._ui_list.verticalHeader().setVisible(False)
-        self._ui_list.setHorizontalHeaderLabels(["Host", "Port"])
+        self._ui_list.setHorizontalHeaderLabels(["Host", "Port", "Protocol"])
         self._ui_list.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self._ui_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         self._ui_list.itemChanged.connect(self._updated)
@@ -71,6 +72,7 @@ class OSCInConfigurator(Configurator):
         header = self._ui_list.horizontalHeader()
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
         header.setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeToContents)
 
         self._ui_clear_action = QtWidgets.QAction(Icon(':/rc/remove-white.png'), 'Clear', self)
         self._ui_clear_action.triggered.connect(self.clear_action)
@@ -104,13 +106,15 @@ class OSCInConfigurator(Configurator):
 
         for entity in self._osc_entity.childs():
             if entity.get('mode', default=None) == 'in':
-                clients.append((entity.get('host', default='127.0.0.1'), entity.get('port', default=9000)))
+                clients.append((entity.get('host', default='127.0.0.1'),
+                                entity.get('port', default=9000),
+                                entity.get('protocol', default=OSCHost.UDP)))
 
         self._do_not_update = True
         self._ui_list.setRowCount(len(clients))
 
         for index, client in enumerate(clients):
-            host, port = client
+            host, port, protocol = client
 
             host_item = QtWidgets.QTableWidgetItem(host)
             port_item = QtWidgets.QTableWidgetItem()
@@ -118,6 +122,7 @@ class OSCInConfigurator(Configurator):
 
             self._ui_list.setItem(index, 0, host_item)
             self._ui_list.setItem(index, 1, port_item)
+            self._ui_list.setCellWidget(index, 2, _protocol_box(protocol, self._updated))
 
         self._ui_toolbar_label.setText("%d Inputs" % len(clients))
         self._do_not_update = False
@@ -144,12 +149,14 @@ class OSCInConfigurator(Configurator):
             if host and port:
                 host = str(self._ui_list.item(index, 0).text())
                 port = int(self._ui_list.item(index, 1).text())
+                protocol = _protocol(self._ui_list.cellWidget(index, 2))
 
-                self._osc_host.input.add(host, port)
+                self._osc_host.input.add(host, port, protocol)
 
                 entity = self._osc_entity.create('Input from %s:%d' % (host, port))
                 entity.set('host', host)
                 entity.set('port', port)
+                entity.set('protocol', protocol)
                 entity.set('mode', 'in')
                 entity.update()
 
@@ -182,14 +189,16 @@ class OSCInConfigurator(Configurator):
         self._last_port += 1
         host = '127.0.0.1'
         port = self._last_port
+        protocol = OSCHost.UDP
 
         # Add to OSC clients
-        self._osc_host.input.add(host, port)
+        self._osc_host.input.add(host, port, protocol)
 
         # Save in settings
         entity = self._osc_entity.create('Input from %s:%d' % (host, port))
         entity.set('host', host)
         entity.set('port', port)
+        entity.set('protocol', protocol)
         entity.set('mode', 'in')
         entity.update()
 
@@ -249,7 +258,8 @@ class OSCOutConfigurator(Configurator):
         for entity in self._osc_entity.childs():
             if entity.get('mode', default=None) == 'out':
                 self._osc_host.output.add(entity.get('host', default='127.0.0.1'),
-                                          entity.get('port', default=8000))
+                                          entity.get('port', default=8000),
+                                          entity.get('protocol', default=OSCHost.UDP))
 
         self.__ui__()
         self.clicked()
@@ -261,10 +271,10 @@ class OSCOutConfigurator(Configurator):
         self._ui_list = QtWidgets.QTableWidget()
         self._ui_list.setObjectName("OSCOutConfigurator_list")
         self._ui_list.setShowGrid(False)
-        self._ui_list.setColumnCount(2)
+        self._ui_list.setColumnCount(3)
         self._ui_list.horizontalHeader().setVisible(False)
         self._ui_list.verticalHeader().setVisible(False)
-        self._ui_list.setHorizontalHeaderLabels(["Host", "Port"])
+        self._ui_list.setHorizontalHeaderLabels(["Host", "Port", "Protocol"])
         self._ui_list.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self._ui_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         self._ui_list.itemChanged.connect(self._updated)
@@ -274,6 +284,7 @@ class OSCOutConfigurator(Configurator):
         header = self._ui_list.horizontalHeader()
         header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
         header.setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        header.setSectionResizeMode(2, QtWidgets.QHeaderView.ResizeToContents)
 
         self._ui_clear_action = QtWidgets.QAction(Icon(':/rc/remove-white.png'), 'Clear', self)
         self._ui_clear_action.triggered.connect(self.clear_action)
@@ -309,7 +320,7 @@ class OSCOutConfigurator(Configurator):
         self._ui_list.setRowCount(len(clients))
 
         for index, client in enumerate(clients):
-            host, port = client
+            host, port, protocol = client
 
             host_item = QtWidgets.QTableWidgetItem(host)
             port_item = QtWidgets.QTableWidgetItem()
@@ -317,6 +328,7 @@ class OSCOutConfigurator(Configurator):
 
             self._ui_list.setItem(index, 0, host_item)
             self._ui_list.setItem(index, 1, port_item)
+            self._ui_list.setCellWidget(index, 2, _protocol_box(protocol, self._updated))
 
         self._ui_toolbar_label.setText("%d Outputs" % len(clients))
         self._do_not_update = False
@@ -343,12 +355,14 @@ class OSCOutConfigurator(Configurator):
             if host and port:
                 host = str(self._ui_list.item(index, 0).text())
                 port = int(self._ui_list.item(index, 1).text())
+                protocol = _protocol(self._ui_list.cellWidget(index, 2))
 
-                self._osc_host.output.add(host, port)
+                self._osc_host.output.add(host, port, protocol)
 
                 entity = self._osc_entity.create('Output to %s:%d' % (host, port))
                 entity.set('host', host)
                 entity.set('port', port)
+                entity.set('protocol', protocol)
                 entity.set('mode', 'out')
                 entity.update()
 
@@ -381,14 +395,16 @@ class OSCOutConfigurator(Configurator):
         self._last_port += 1
         host = '127.0.0.1'
         port = self._last_port
+        protocol = OSCHost.UDP
 
         # Add to OSC clients
-        self._osc_host.output.add(host, port)
+        self._osc_host.output.add(host, port, protocol)
 
         # Save in settings
         entity = self._osc_entity.create('Output to %s:%d' % (host, port))
         entity.set('host', host)
         entity.set('port', port)
+        entity.set('protocol', protocol)
         entity.set('mode', 'out')
         entity.update()
 
@@ -412,3 +428,20 @@ class OSCOutConfigurator(Configurator):
                 self._osc_entity.remove(entity)
 
         self._update()
+
+
+def _protocol_box(protocol, changed):
+    """Returns combo box to choose OSC protocol"""
+
+    box = QtWidgets.QComboBox()
+    box.addItems(OSCHost.PROTOCOLS)
+    box.setCurrentText(protocol)
+    box.currentIndexChanged.connect(changed)
+
+    return box
+
+
+def _protocol(box):
+    """Returns protocol chosen in combo box"""
+
+    return box.currentText() if box else OSCHost.UDP
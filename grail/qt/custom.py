@@ -221,15 +221,15 @@ class _QToolBar(QtWidgets.QToolBar, _QWidget):
         self.style().drawPrimitive(QtWidgets.QStyle.PE_Widget, option, painter, self)
 
 
-class _QTreeWidget(QtWidgets.QTreeWidget, _QWidget):
-    """Tree widget with predefined properties"""
+class _QTreeMixin:
+    """Predefined properties and custom scrollbar of tree widget and tree view"""
 
-    def __init__(self, parent=None):
-        super(_QTreeWidget, self).__init__(parent)
+    def _setup_tree(self):
+        """Apply properties and create custom scrollbar"""
 
         self.setAlternatingRowColors(True)
         self.setAttribute(QtCore.Qt.WA_MacShowFocusRect, False)
-        self.header().close()
+        self.setHeaderHidden(True)
         self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
         self.setDragEnabled(True)
         self.viewport().setAcceptDrops(True)
@@ -266,11 +266,30 @@ class _QTreeWidget(QtWidgets.QTreeWidget, _QWidget):
     def paintEvent(self, event):
         """Redraw a widget"""
 
-        QT_QTREEWIDGET.paintEvent(self, event)
+        # original Qt class is next in order of resolution
+        super(_QTreeMixin, self).paintEvent(event)
 
         self._update_scrollbar()
 
 
+class _QTreeWidget(_QTreeMixin, QtWidgets.QTreeWidget, _QWidget):
+    """Tree widget with predefined properties"""
+
+    def __init__(self, parent=None):
+        super(_QTreeWidget, self).__init__(parent)
+
+        self._setup_tree()
+
+
+class _QTreeView(_QTreeMixin, QtWidgets.QTreeView, _QWidget):
+    """Tree view with predefined properties, same as tree widget"""
+
+    def __init__(self, parent=None):
+        super(_QTreeView, self).__init__(parent)
+
+        self._setup_tree()
+
+
 # noinspection PyPep8Naming
 class _QTreeWidgetItem(QtWidgets.QTreeWidgetItem):
     """Representation of node as QTreeWidgetItem"""
@@ -668,6 +687,7 @@ QtWidgets.QToolBar = _QToolBar
 
 QtWidgets.QTableWidget = _QTableWidget
 QtWidgets.QTreeWidget = _QTreeWidget
+QtWidgets.QTreeView = _QTreeView
 QtWidgets.QTreeWidgetItem = _QTreeWidgetItem
 QtWidgets.QListWidget = _QListWidget
 QtWidgets.QListWidgetItem = _QListWidgetItem
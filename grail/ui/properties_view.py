@@ -13,6 +13,7 @@ import random
 import itertools
 
 from grail.qt import *
+from grail.core import connect_slot
 
 
 class PropertiesView(QtWidgets.QWidget):
@@ -81,11 +82,11 @@ class PropertiesView(QtWidgets.QWidget):
 
         self.setLayout(self._ui_layout)
 
-        # Track project changes
+        # Track project changes, view is created by every cuelist viewer
         project = Application.instance().project
-        project.entity_changed.connect(self._update)
-        project.entity_removed.connect(self._update)
-        project.property_changed.connect(lambda entity_id, key, value: self._update())
+        connect_slot(project.entity_changed, self._update)
+        connect_slot(project.entity_removed, self._update)
+        connect_slot(project.property_changed, lambda entity_id, key, value: self._update())
 
     def _context_menu(self, point):
         """Context menu callback